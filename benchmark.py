@@ -0,0 +1,286 @@
+"""
+Suíte de benchmarks do graph_lib e dos algoritmos de emparelhamento.
+
+Cada caso é medido com time.perf_counter depois de rodadas de aquecimento,
+repetido para obter estatísticas, e executado mais uma vez sob tracemalloc
+para o pico de memória (fora das medições de tempo, que o rastreamento
+distorce). Os resultados vão para um arquivo JSON; o modo compare confronta
+esse arquivo com uma linha de base e aponta regressões. Um caso que falha
+fica registrado como erro no relatório sem interromper os demais (no
+data.txt de exemplo, os caminhos mínimos esbarram num ciclo negativo).
+
+    python -c "import graph_generators; graph_generators.grid(300, 300, seed=0, path='grade.txt')"
+    python benchmark.py run --graph grade.txt --out resultados.json
+    python benchmark.py compare base.json resultados.json --threshold 0.1
+
+Com --check-load, a execução também falha se algum load[...] ficar mais
+lento que load[referência], a leitura linha a linha original do graph_lib.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from graph_lib import Graph
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hopcroft-karp'))
+from generators import bipartite_graph  # noqa: E402
+from algorithms import (  # noqa: E402
+    HopcroftKarp, IndexedHopcroftKarp, DFSMatching, BFSMatching, ComponentMatching,
+    AuctionMatching, CapacitatedHopcroftKarp,
+)
+
+
+def measure(fn, setup=None, repeat=5, warmup=1):
+    """
+    Mede fn(setup()) com aquecimento e repetições; o tempo de setup fica de
+    fora. Retorna as estatísticas em segundos e o pico de memória em bytes.
+    """
+    def once():
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        fn(arg)
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        once()
+    times = [once() for _ in range(repeat)]
+    arg = setup() if setup is not None else None
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return {
+        'repeat': repeat,
+        'warmup': warmup,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'peak_memory': peak,
+    }
+
+
+def reference_load(path):
+    """
+    Carregador de referência: a leitura linha a linha original do graph_lib
+    (nomes ordenados e listas de adjacência com uma inserção por aresta),
+    contra a qual os casos load[...] são conferidos por --check-load.
+    """
+    with open(path) as f:
+        f.readline()
+        nodes, edges = [], []
+        for line in f:
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            u, v = parts[:2]
+            nodes.extend([u, v])
+            edges.append((u, v, float(parts[2]) if len(parts) > 2 else 1.0))
+    adj_list = {name: [] for name in sorted(set(nodes))}
+    for u, v, w in edges:
+        adj_list[u].append((v, w))
+        adj_list[v].append((u, w))
+    return adj_list
+
+
+def graph_cases(path, representations):
+    """Casos do graph_lib sobre o arquivo de arestas em path: (nome, fn, setup)."""
+    yield 'load[referência]', lambda _: reference_load(path), None
+    for representation in representations:
+        yield f'load[{representation}]', lambda _, r=representation: Graph(representation=r, data_path=path), None
+        graph = Graph(representation=representation, data_path=path)
+        # Origem no maior componente e destino no último nível da BFS a
+        # partir dela, para que os caminhos medidos existam de fato.
+        source = graph.connected_components()[0][0]
+        target = list(graph.bfs(source)[1])[-1]
+        yield f'bfs[{representation}]', lambda _, g=graph, s=source: g.bfs(s), None
+        yield f'dfs[{representation}]', lambda _, g=graph, s=source: g.dfs(s), None
+        yield f'connected_components[{representation}]', lambda _, g=graph: g.connected_components(), None
+
+        def fresh_components(g=graph):
+            # component_labels guarda o union-find; cada medição parte do zero.
+            g._components = None
+            return g
+        yield f'component_labels[{representation}]', lambda g: g.component_labels(), fresh_components
+        yield f'shortest_path[{representation}]', lambda _, g=graph, s=source, t=target: g.shortest_path(s, t), None
+        yield f'shortest_path_tree[{representation}]', lambda _, g=graph, s=source: g.shortest_path_tree(s), None
+
+
+def matching_cases(size, seed):
+    """Casos dos algoritmos de emparelhamento: (nome, fn, setup)."""
+    graph = bipartite_graph(size, size, min_degree=5, max_degree=5, seed=seed)
+    # O estado do emparelhamento vive no objeto; cada medição usa um novo.
+    matchers = {
+        'Hopcroft-Karp': HopcroftKarp,
+        'HK (índices)': IndexedHopcroftKarp,
+        'HK (componentes)': lambda g: ComponentMatching(g, workers=1),
+        'DFS': DFSMatching,
+        'BFS': BFSMatching,
+    }
+    for name, matcher in matchers.items():
+        yield f'matching[{name}]', lambda m: m.max_matching(), lambda g=graph, matcher=matcher: matcher(g)
+
+    # O leilão exige atribuição que cubra U; com o dobro de hospitais e cinco
+    # arestas por médico ela existe nas instâncias sorteadas.
+    weighted = bipartite_graph(size, 2 * size, min_degree=5, max_degree=5, seed=seed, weights=(1, 100))
+    yield 'matching[Leilão]', lambda m: m.max_matching(), lambda: AuctionMatching(weighted)
+
+    capacitated = bipartite_graph(size, size, min_degree=5, max_degree=5, seed=seed)
+    rng = random.Random(seed)
+    for v in capacitated.get_V()[:size // 10]:
+        capacitated.set_capacity_V(v, rng.randint(2, 10))
+    yield 'matching[HK capacitado]', lambda m: m.max_matching(), lambda: CapacitatedHopcroftKarp(capacitated)
+
+
+def run(args):
+    cases = []
+    if args.graph:
+        cases.extend(graph_cases(args.graph, args.representations))
+    if args.matching_size:
+        cases.extend(matching_cases(args.matching_size, args.seed))
+    results = {}
+    for name, fn, setup in cases:
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            results[name] = stats = measure(fn, setup, args.repeat, args.warmup)
+        except Exception as error:
+            # Um caso que falha (por exemplo, caminhos mínimos num grafo com
+            # ciclo negativo) fica registrado no relatório sem abortar os demais.
+            results[name] = {'error': f'{type(error).__name__}: {error}'}
+            print(f"{name:<40} FALHOU  {results[name]['error']}")
+            continue
+        print(f"{name:<40} mediana {stats['median']:.6f}s  mín {stats['min']:.6f}s  "
+              f"pico {stats['peak_memory'] / 1024:.1f} KiB")
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'graph': args.graph,
+            'matching_size': args.matching_size,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.check_load and load_regressions(results, args.threshold):
+        return 1
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, report, args.threshold, args.memory_threshold) else 0
+    return 0
+
+
+def load_regressions(results, threshold=0.1):
+    """
+    Casos load[...] cuja mediana passa a do carregador de referência além da
+    tolerância relativa: o carregamento ficou mais lento que o original.
+    """
+    reference = results.get('load[referência]', {}).get('median')
+    if reference is None:
+        return []
+    regressions = []
+    for name, stats in results.items():
+        if name.startswith('load[') and name != 'load[referência]' and 'median' in stats:
+            ratio = stats['median'] / reference if reference else 1.0
+            if ratio > 1 + threshold:
+                regressions.append(name)
+            status = 'REGRESSÃO TEMPO' if ratio > 1 + threshold else 'ok'
+            print(f"{name:<40} x{ratio:.2f} da referência  {status}")
+    return regressions
+
+
+def compare(baseline, current, threshold=0.1, memory_threshold=0.1):
+    """
+    Confronta dois relatórios caso a caso pela mediana do tempo e pelo pico
+    de memória; retorna os casos que pioraram além das tolerâncias relativas
+    e os que passaram a falhar.
+    """
+    regressions = []
+    base_results, results = baseline['results'], current['results']
+    for name in results:
+        if name not in base_results:
+            print(f"{name:<40} novo (sem linha de base)")
+            continue
+        old, new = base_results[name], results[name]
+        if 'error' in new:
+            if 'error' not in old:
+                regressions.append(name)
+            status = 'falhou também na linha de base' if 'error' in old else 'REGRESSÃO FALHA'
+            print(f"{name:<40} {status}: {new['error']}")
+            continue
+        if 'error' in old:
+            print(f"{name:<40} falhou na linha de base (sem comparação)")
+            continue
+        time_ratio = new['median'] / old['median'] if old['median'] else 1.0
+        memory_ratio = new['peak_memory'] / old['peak_memory'] if old['peak_memory'] else 1.0
+        flags = []
+        if time_ratio > 1 + threshold:
+            flags.append('TEMPO')
+        if memory_ratio > 1 + memory_threshold:
+            flags.append('MEMÓRIA')
+        if flags:
+            regressions.append(name)
+        status = 'REGRESSÃO ' + '+'.join(flags) if flags else 'ok'
+        print(f"{name:<40} tempo x{time_ratio:.2f}  memória x{memory_ratio:.2f}  {status}")
+    for name in base_results:
+        if name not in results:
+            print(f"{name:<40} ausente nesta execução")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='executa os benchmarks')
+    run_parser.add_argument('--graph', help='arquivo de arestas para os casos do graph_lib')
+    run_parser.add_argument('--representations', nargs='+', default=['csr', 'adj_list'])
+    run_parser.add_argument('--matching-size', type=int, default=1000,
+                            help='tamanho n das instâncias n x n de emparelhamento (0 desliga)')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--filter', help='só casos cujo nome contém este texto')
+    run_parser.add_argument('--out', help='arquivo JSON de saída')
+    run_parser.add_argument('--baseline', help='relatório JSON para comparar ao fim')
+    run_parser.add_argument('--check-load', action='store_true',
+                            help='falha se algum load[...] for mais lento que o carregador de referência')
+    run_parser.add_argument('--threshold', type=float, default=0.1)
+    run_parser.add_argument('--memory-threshold', type=float, default=0.1)
+
+    compare_parser = commands.add_parser('compare', help='compara um relatório com a linha de base')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        return run(args)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    return 1 if compare(baseline, current, args.threshold, args.memory_threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
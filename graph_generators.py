@@ -0,0 +1,146 @@
+"""
+Geradores sintéticos de grafos ponderados para testes em larga escala,
+vetorizados com NumPy e reprodutíveis pela semente.
+
+Cada gerador produz as arestas em blocos de arrays (u, v, w) com
+identificadores 0..n-1 e entrega o resultado de um de dois jeitos: sem path,
+um Graph montado em memória (CSR por padrão, construído direto com NumPy); com path, um
+arquivo de arestas no formato de data.txt (número de vértices na primeira
+linha e depois "u v peso", com vértices numerados a partir de 1), gravado
+bloco a bloco sem materializar o grafo. Os dois caminhos dão o mesmo grafo:
+como o arquivo só descreve arestas, vértices que ficam isolados (na malha
+com drop, por exemplo) são omitidos também em memória, e graph.n pode ser
+menor que o n pedido.
+"""
+import numpy as np
+
+from graph_lib import Graph
+
+# Arestas por bloco gerado e gravado.
+_BLOCK = 1 << 20
+
+
+def _weights(rng, size, weights):
+    # Pesos uniformes em [lo, hi) com três casas, para o arquivo texto
+    # reproduzir exatamente os valores gerados em memória.
+    lo, hi = weights
+    return np.round(rng.uniform(lo, hi, size), 3)
+
+
+def _erdos_renyi_blocks(n, m, rng, weights):
+    for start in range(0, m, _BLOCK):
+        size = min(_BLOCK, m - start)
+        u = rng.integers(0, n, size)
+        # Deslocamento em 1..n-1 sorteia v entre os demais vértices, sem laços.
+        v = (u + rng.integers(1, n, size)) % n
+        yield u, v, _weights(rng, size, weights)
+
+
+def _grid_blocks(rows, cols, rng, weights, drop):
+    # Malha rows x cols processada em faixas de linhas; cada vértice liga-se
+    # ao vizinho da direita e ao de baixo, e cada aresta some com prob. drop.
+    band = max(1, _BLOCK // (2 * cols))
+    for top in range(0, rows, band):
+        ids = np.arange(top * cols, min(top + band, rows) * cols)
+        right = ids[ids % cols != cols - 1]
+        down = ids[ids < (rows - 1) * cols]
+        u = np.concatenate((right, down))
+        v = np.concatenate((right + 1, down + cols))
+        if drop:
+            keep = rng.random(len(u)) >= drop
+            u, v = u[keep], v[keep]
+        yield u, v, _weights(rng, len(u), weights)
+
+
+def _barabasi_albert_blocks(n, m, rng, weights):
+    # Batagelj-Brandes vetorizado: a aresta k liga o vértice k // m a um
+    # extremo sorteado entre as 2k posições anteriores da lista de extremos,
+    # o que dá escolha proporcional ao grau. Posições pares guardam a origem
+    # (conhecida) e as ímpares apontam para outra posição anterior; os
+    # ponteiros são resolvidos por saltos até caírem numa posição par.
+    total = n * m
+    k = np.arange(total)
+    pointer = (rng.random(total) * 2 * k).astype(np.int64)
+    odd = np.flatnonzero(pointer & 1)
+    while len(odd):
+        pointer[odd] = pointer[pointer[odd] >> 1]
+        odd = odd[pointer[odd] & 1 == 1]
+    u = k // m
+    v = (pointer >> 1) // m
+    # Sorteios que caem no próprio vértice viram laços e são descartados.
+    keep = u != v
+    u, v = u[keep], v[keep]
+    for start in range(0, len(u), _BLOCK):
+        size = min(_BLOCK, len(u) - start)
+        yield u[start:start + size], v[start:start + size], _weights(rng, size, weights)
+
+
+def _to_graph(n, blocks, representation):
+    # Monta o CSR do Graph com NumPy como Graph(data_path=...) faria com o
+    # arquivo das mesmas arestas: só entram os vértices com alguma aresta
+    # (o formato de arquivo não tem como listar isolados), os índices seguem
+    # a ordem alfabética dos nomes e cada aresta entra nas linhas dos dois
+    # extremos na ordem em que o carregador as gravaria.
+    parts = list(blocks)
+    u = np.concatenate([part[0] for part in parts]) if parts else np.empty(0, np.int64)
+    v = np.concatenate([part[1] for part in parts]) if parts else np.empty(0, np.int64)
+    w = np.concatenate([part[2] for part in parts]) if parts else np.empty(0)
+    present = np.zeros(n, bool)
+    present[u] = present[v] = True
+    names = sorted(map(str, (np.flatnonzero(present) + 1).tolist()))
+    size = len(names)
+    index = np.zeros(n, np.int64)
+    index[np.array(list(map(int, names)), np.int64) - 1] = np.arange(1, size + 1)
+    i, j = index[u], index[v]
+    rows = np.column_stack((i, j)).ravel()
+    order = np.argsort(rows, kind='stable')
+    neighbors = np.column_stack((j, i)).ravel()[order].astype(np.int32)
+    weights = np.repeat(w, 2)[order].astype(np.float64)
+    offsets = np.zeros(size + 2, np.int64)
+    np.cumsum(np.bincount(rows, minlength=size + 1), out=offsets[1:])
+    return Graph.from_csr(names, offsets, neighbors, weights, representation)
+
+
+def _emit(n, blocks, path, representation):
+    if path is None:
+        return _to_graph(n, blocks, representation)
+    with open(path, 'w') as f:
+        f.write(f'{n}\n')
+        for u, v, w in blocks:
+            f.write(''.join(map('{} {} {:.3f}\n'.format, (u + 1).tolist(), (v + 1).tolist(), w.tolist())))
+    return path
+
+
+def erdos_renyi(n, m, seed=None, weights=(1.0, 10.0), path=None, representation='csr'):
+    """
+    Grafo G(n, m): m arestas com extremos uniformes entre vértices distintos
+    (arestas repetidas são possíveis, e raras quando m << n²).
+    """
+    if n < 2:
+        raise ValueError('erdos_renyi precisa de pelo menos 2 vértices.')
+    rng = np.random.default_rng(seed)
+    return _emit(n, _erdos_renyi_blocks(n, m, rng, weights), path, representation)
+
+
+def grid(rows, cols, seed=None, weights=(1.0, 10.0), drop=0.0, path=None, representation='csr'):
+    """
+    Malha rows x cols no estilo de uma rede viária: vértice r * cols + c
+    ligado aos vizinhos ortogonais, com cada aresta removida com
+    probabilidade drop.
+    """
+    if not 0.0 <= drop < 1.0:
+        raise ValueError('drop deve estar em [0, 1).')
+    rng = np.random.default_rng(seed)
+    return _emit(rows * cols, _grid_blocks(rows, cols, rng, weights, drop), path, representation)
+
+
+def barabasi_albert(n, m, seed=None, weights=(1.0, 10.0), path=None, representation='csr'):
+    """
+    Grafo de Barabási-Albert: cada vértice novo liga-se a m vértices
+    anteriores escolhidos com probabilidade proporcional ao grau, o que gera
+    graus em lei de potência.
+    """
+    if m < 1:
+        raise ValueError('barabasi_albert precisa de m >= 1.')
+    rng = np.random.default_rng(seed)
+    return _emit(n, _barabasi_albert_blocks(n, m, rng, weights), path, representation)
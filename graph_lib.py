@@ -1,52 +1,1027 @@
-from collections import deque, defaultdict
+from array import array
+from collections import Counter, OrderedDict, deque, defaultdict
+from itertools import islice, repeat
 import heapq
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Tamanho aproximado dos blocos lidos do arquivo de arestas pelo carregador.
+_CHUNK_SIZE = 1 << 24
+
+# Snapshot binário: cabeçalho fixo seguido das seções offsets (int64),
+# vizinhos (int32), pesos (float64) e, desde a versão 2, os arcos negativos
+# (pares int32), cada uma alinhada a 8 bytes, e da tabela de nomes em UTF-8
+# separados por '\n'.
+_SNAPSHOT_MAGIC = b'GTKGRAPH'
+_SNAPSHOT_VERSION = 2
+_SNAPSHOT_HEADER_V1 = struct.Struct('<8sIc3xQQQ')
+_SNAPSHOT_HEADER = struct.Struct('<8sIc3xQQQQ')
+_BYTE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+_REPRESENTATIONS = ('adj_list', 'adj_matrix', 'csr', 'bitset')
+
+# Registros (linhas de texto ou itens binários) por escrita nos exportadores.
+_EXPORT_BLOCK = 1 << 16
+
+# Os exportadores binários gravam NPY 1.0 (numpy.load) com cabeçalho de
+# tamanho fixo, regravado no fim quando o número de registros é conhecido.
+_NPY_MAGIC = b'\x93NUMPY\x01\x00'
+_NPY_HEADER_SIZE = 256
+
+# Máximo de vértices visitados ao decidir se a remoção de uma aresta separou
+# um componente rastreado; acima disso o union-find é remontado sob demanda.
+_SPLIT_SEARCH_LIMIT = 1024
+
+# Melhora relativa mínima para o SPFA relaxar um arco.
+_RELAX_TOLERANCE = 1e-9
+
+# Índice de landmarks (ALT): cabeçalho, ids dos landmarks (int32) e um vetor
+# de distâncias por landmark ('d' ou 'f'), cada seção alinhada a 8 bytes. A
+# versão 2 acrescenta, quando o grafo tem arcos negativos, um segundo conjunto
+# de vetores com as distâncias até cada landmark (na versão 1 o byte é zero).
+_LANDMARKS_MAGIC = b'GTKALT\0\0'
+_LANDMARKS_VERSION = 2
+_LANDMARKS_HEADER = struct.Struct('<8sIccB1xQQd')
+
+
+class _Interner(dict):
+    # Atribui ids sequenciais aos nomes na ordem em que aparecem.
+    def __missing__(self, name):
+        idx = self[name] = len(self)
+        return idx
+
+
+def _parse_edge_chunk(chunk, intern, us, vs, ws):
+    # Caminho rápido: quando todas as linhas têm o mesmo número de colunas
+    # (2 ou 3), as colunas saem do fatiamento da lista de tokens. Só um total
+    # de 3 ou 2 tokens por linha pode ser regular; mesmo assim ele é
+    # conferido linha a linha, pois "1 2" seguido de "3 4 5 6" também soma 3
+    # tokens por linha. Qualquer outro total vai direto ao laço por linha.
+    tokens = chunk.split()
+    lines = chunk.split(b'\n')
+    if lines and not lines[-1]:
+        lines.pop()
+    widths = None
+    if len(tokens) in (3 * len(lines), 2 * len(lines)):
+        widths = set(map(len, map(bytes.split, lines)))
+    if widths == {3}:
+        us.extend(map(intern.__getitem__, tokens[0::3]))
+        vs.extend(map(intern.__getitem__, tokens[1::3]))
+        ws.extend(map(float, tokens[2::3]))
+    elif widths == {2}:
+        us.extend(map(intern.__getitem__, tokens[0::2]))
+        vs.extend(map(intern.__getitem__, tokens[1::2]))
+        ws.extend(repeat(1.0, len(tokens) // 2))
+    else:
+        for line in lines:
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            us.append(intern[parts[0]])
+            vs.append(intern[parts[1]])
+            ws.append(float(parts[2]) if len(parts) > 2 else 1.0)
+
+
+def _scan_edge_file(data_path, consume, chunk_size=_CHUNK_SIZE):
+    # Percorre um arquivo de arestas através de mmap, entregando a consume
+    # blocos de linhas completas. Retorna o número declarado de vértices.
+    with open(data_path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            raise ValueError('Arquivo de arestas vazio.')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = mm.find(b'\n')
+            if pos < 0:
+                pos = len(mm)
+            declared = int(mm[:pos])
+            pos += 1
+            while pos < len(mm):
+                end = mm.find(b'\n', min(pos + chunk_size, len(mm)) - 1)
+                end = len(mm) if end < 0 else end + 1
+                consume(mm[pos:end])
+                pos = end
+    return declared
+
+
+def _read_edge_list(data_path, chunk_size=_CHUNK_SIZE):
+    """
+    Lê um arquivo de arestas (cabeçalho com o número de vértices seguido de
+    linhas "u v [peso]") em blocos através de mmap.
+
+    Retorna o número declarado de vértices, o dicionário nome (bytes) -> id
+    provisório e os arrays de origem, destino e peso de cada aresta.
+    """
+    intern = _Interner()
+    us, vs, ws = array('i'), array('i'), array('d')
+    declared = _scan_edge_file(
+        data_path, lambda chunk: _parse_edge_chunk(chunk, intern, us, vs, ws), chunk_size)
+    return declared, intern, us, vs, ws
+
+
+def _batches(iterable, size=_EXPORT_BLOCK):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _npy_header(descr, count):
+    text = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (descr, count)
+    text = text.ljust(_NPY_HEADER_SIZE - len(_NPY_MAGIC) - 3) + '\n'
+    return _NPY_MAGIC + struct.pack('<H', len(text)) + text.encode('latin1')
+
+
+def _write_npy(path, descr, itemsize, blocks):
+    # Grava em path um array NPY unidimensional com o dtype descr, a partir
+    # de blocos (bytes ou arrays) com registros de itemsize bytes.
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(_npy_header(descr, 0))
+        for block in blocks:
+            f.write(block)
+            count += memoryview(block).nbytes // itemsize
+        f.seek(0)
+        f.write(_npy_header(descr, count))
+
+
+class _DisjointSet:
+    # Union-find sobre os elementos 0..len-1, com união por posto e
+    # compressão de caminho; size guarda o tamanho de cada conjunto na raiz.
+    def __init__(self, n=0):
+        self.parent = array('i', range(n))
+        self.rank = bytearray(n)
+        self.size = array('i', [1]) * n
+
+    def __len__(self):
+        return len(self.parent)
+
+    def grow(self, n):
+        # Acrescenta elementos isolados até haver n.
+        k = len(self.parent)
+        if n > k:
+            self.parent.extend(range(k, n))
+            self.rank.extend(bytes(n - k))
+            self.size.extend(repeat(1, n - k))
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x, y):
+        # Une os conjuntos de x e y; retorna False se já eram o mesmo.
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self.rank[x] < self.rank[y]:
+            x, y = y, x
+        self.parent[y] = x
+        self.size[x] += self.size[y]
+        if self.rank[x] == self.rank[y]:
+            self.rank[x] += 1
+        return True
+
+    def union_edges(self, us, vs):
+        union = self.union
+        for x, y in zip(us, vs):
+            union(x, y)
+
+    def labels(self, elements):
+        # Rótulos compactos 1..k para os elementos na ordem dada (a posição 0
+        # fica livre, como nos índices do grafo), numerados pela ordem em que
+        # cada conjunto aparece, e o tamanho de cada rótulo.
+        find = self.find
+        labels = array('i', [0])
+        sizes = array('q', [0])
+        root_label = {}
+        for x in elements:
+            root = find(x)
+            label = root_label.get(root)
+            if label is None:
+                label = root_label[root] = len(sizes)
+                sizes.append(self.size[root])
+            labels.append(label)
+        return labels, sizes
+
+
+class Components:
+    """
+    Componentes conexos em forma compacta: labels[i] é o rótulo (1..k) do
+    vértice de índice i e sizes[c] o tamanho do componente c. Os rótulos
+    seguem a ordem do menor índice de cada componente, e a lista de membros
+    de um componente só é montada quando pedida.
+    """
+
+    def __init__(self, labels, sizes, node_to_idx, idx_to_node):
+        self.labels = labels
+        self.sizes = sizes
+        self.node_to_idx = node_to_idx
+        self.idx_to_node = idx_to_node
+
+    def __len__(self):
+        return len(self.sizes) - 1
+
+    def label(self, v):
+        return self.labels[self.node_to_idx[v]]
+
+    def size(self, v):
+        return self.sizes[self.label(v)]
+
+    def largest_k(self, k):
+        # Pares (rótulo, tamanho) dos k maiores componentes, sem ordenar todos.
+        top = heapq.nlargest(k, range(1, len(self.sizes)), key=self.sizes.__getitem__)
+        return [(label, self.sizes[label]) for label in top]
+
+    def members(self, label):
+        names = self.idx_to_node
+        return [names[i] for i, c in enumerate(self.labels) if c == label]
+
+
+def _csr_from_edges(n, us, vs, ws):
+    # CSR (compressed sparse row): os vizinhos do vértice i (a partir de 1)
+    # ficam em neighbors[offsets[i]:offsets[i+1]], com os pesos nas mesmas
+    # posições de weights. Cada aresta não direcionada aparece uma vez em
+    # cada extremidade.
+    offsets = array('q', bytes(8 * (n + 2)))
+    for counts in (Counter(us), Counter(vs)):
+        for i, d in counts.items():
+            offsets[i + 1] += d
+    for i in range(1, n + 2):
+        offsets[i] += offsets[i-1]
+    neighbors = array('i', bytes(4 * offsets[-1]))
+    weights = array('d', bytes(8 * offsets[-1]))
+    cursor = array('q', offsets)
+    for i, j, w in zip(us, vs, ws):
+        k = cursor[i]
+        neighbors[k] = j
+        weights[k] = w
+        cursor[i] = k + 1
+        k = cursor[j]
+        neighbors[k] = i
+        weights[k] = w
+        cursor[j] = k + 1
+    return offsets, neighbors, weights
+
+
+def _bit_positions(bits):
+    # Posições dos bits ligados de um inteiro, em ordem crescente.
+    digits = bin(bits)[:1:-1]
+    pos = digits.find('1')
+    while pos >= 0:
+        yield pos
+        pos = digits.find('1', pos + 1)
+
+
+def _reached(dist, d):
+    # -1 só marca os inalcançáveis nas distâncias inteiras da BFS; com pesos
+    # reais, -1.0 é uma distância válida (arestas negativas) e só inf marca.
+    return d != -1 if dist.typecode == 'i' else d != float('inf')
+
+
+# Grafo compartilhado (somente leitura) pelos processos de
+# multi_source_shortest_paths: herdado via fork ou aberto de um snapshot.
+_shared_graph = None
+
+
+def _init_shared_graph(path, negative_edges, potentials):
+    # Os potenciais de Johnson vêm prontos do processo principal.
+    global _shared_graph
+    _shared_graph = Graph.load(path)
+    _shared_graph.negative_edges = negative_edges
+    _shared_graph._potentials = potentials
+
+
+def _shared_distances(source):
+    return source, _shared_graph._distance_vector(_shared_graph.node_to_idx[source])
+
+
+def _map_file(path, shared=True):
+    # Mapeia o arquivo somente leitura ou, com shared=False, lê uma cópia dos
+    # bytes; nos dois casos o descritor é fechado antes de retornar.
+    with open(path, 'rb') as f:
+        if not shared:
+            return f.read()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ShortestPathTree:
+    """
+    Árvore de caminhos mínimos a partir de source, guardada apenas como os
+    arrays indexados por node_to_idx: dist (-1 na BFS ou inf nos inalcançáveis)
+    e parent (0 na origem e nos inalcançáveis). Os caminhos são reconstruídos
+    só quando pedidos; tree[v] devolve (distância, caminho) como os valores de
+    all_shortest_paths.
+    """
+
+    def __init__(self, source, dist, parent, node_to_idx, idx_to_node):
+        self.source = source
+        self.dist = dist
+        self.parent = parent
+        self.node_to_idx = node_to_idx
+        self.idx_to_node = idx_to_node
+
+    def _reached(self, i):
+        return _reached(self.dist, self.dist[i])
+
+    def __contains__(self, v):
+        i = self.node_to_idx.get(v)
+        return i is not None and self._reached(i)
+
+    def __iter__(self):
+        # Vértices alcançados, na ordem dos índices.
+        names = self.idx_to_node
+        return (names[i] for i in range(1, len(self.dist)) if self._reached(i))
+
+    def __len__(self):
+        return sum(1 for i in range(1, len(self.dist)) if self._reached(i))
+
+    def distance(self, v):
+        i = self.node_to_idx[v]
+        return round(self.dist[i], 6) if self._reached(i) else float('inf')
+
+    def path(self, v):
+        # Caminho de source até v, ou [] se v é inalcançável.
+        i = self.node_to_idx[v]
+        if not self._reached(i):
+            return []
+        names, parent = self.idx_to_node, self.parent
+        path = [names[i]]
+        while parent[i]:
+            i = parent[i]
+            path.append(names[i])
+        path.reverse()
+        return path
+
+    def __getitem__(self, v):
+        if v not in self:
+            raise KeyError(v)
+        return self.distance(v), self.path(v)
+
+    def items(self):
+        return ((v, self[v]) for v in self)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def to_numpy(self):
+        """
+        Distâncias como vetor float64 do NumPy indexado por node_to_idx (a
+        posição 0 não é usada), com inf nos inalcançáveis. Sem cópia quando
+        as distâncias já são float64; nesse caso o vetor é uma visão somente
+        leitura, pois a árvore pode estar no cache e ser devolvida de novo.
+        """
+        import numpy as np
+        if self.dist.typecode == 'd':
+            vector = np.frombuffer(self.dist, dtype=np.float64)
+            vector.flags.writeable = False
+            return vector
+        vector = np.frombuffer(self.dist, dtype=np.int32).astype(np.float64)
+        vector[vector < 0] = np.inf
+        return vector
+
 
 class Graph:
-    def __init__(self, representation=None, data_path=None):
+    # Tratamento das arestas de peso negativo nos caminhos mínimos. Em
+    # 'directed', uma aresta negativa u v só é percorrida de u para v, no
+    # sentido em que foi listada (as demais continuam nos dois sentidos). Em
+    # 'undirected', ela vale nos dois sentidos e forma um ciclo negativo de
+    # duas arestas, o que sempre é reportado como erro.
+    negative_edges = 'directed'
+
+    def __init__(self, representation=None, data_path=None, track_memory=False):
         self.node_to_idx = {}
         self.idx_to_node = {}
+        self._meta = None
+        self._components = None
+        self._path_cache = None
+        self._landmarks = None
+        self._potentials = None
+        self._index_cache = {}
         if data_path is not None:
-            with open(data_path, 'r') as f:
-                n = int(f.readline())
-                nodes = []
-                edges = []
-                for line in f:
-                    parts = line.split()
-                    if len(parts) < 2:
-                        continue
-                    u, v = parts[:2]
-                    w = float(parts[2]) if len(parts) > 2 else 1.0
-                    nodes.extend([u, v])
-                    edges.append((u, v, w))
-                unique_nodes = sorted(set(nodes))
-                self.n = len(unique_nodes)
-                self.node_to_idx = {name: i+1 for i, name in enumerate(unique_nodes)}
-                self.idx_to_node = {i+1: name for i, name in enumerate(unique_nodes)}
-                self.representation = representation
-                if representation == 'adj_list':
-                    self.adj_list = {name: [] for name in unique_nodes}
-                elif representation == 'adj_matrix':
-                    self.adj_matrix = [[0.0]*(self.n+1) for _ in range(self.n+1)]
-                else:
-                    raise ValueError('Unsupported representation')
-                for u, v, w in edges:
-                    self._add_edge(u, v, w)
+            self._load(data_path, representation, track_memory)
             return
         self.representation = representation
         raise ValueError('num_vertices must be read from data_path. Please provide data_path.')
 
+    def _load(self, data_path, representation, track_memory):
+        if representation not in _REPRESENTATIONS:
+            raise ValueError('Unsupported representation')
+        started_tracing = track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            if track_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            num_edges = self._load_edges(data_path, representation)
+            self.load_stats = {
+                'vertices': self.n,
+                'edges': num_edges,
+                'seconds': time.perf_counter() - start,
+                'peak_memory': None,
+            }
+            if track_memory:
+                self.load_stats['peak_memory'] = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+    def _load_edges(self, data_path, representation):
+        declared, intern, us, vs, ws = _read_edge_list(data_path)
+        if len(intern) > declared:
+            raise ValueError(f'Cabeçalho declara {declared} vértices, mas o arquivo contém {len(intern)}.')
+        unique_nodes = sorted(intern)
+        self.n = len(unique_nodes)
+        self.node_to_idx = {}
+        self.idx_to_node = {}
+        # Índice final de cada id provisório; a ordem de bytes UTF-8 coincide
+        # com a dos nomes decodificados, então os índices seguem a ordem alfabética.
+        remap = array('i', bytes(4 * self.n))
+        for i, raw in enumerate(unique_nodes, 1):
+            name = raw.decode()
+            self.node_to_idx[name] = i
+            self.idx_to_node[i] = name
+            remap[intern[raw]] = i
+        del intern, unique_nodes
+        us = array('i', map(remap.__getitem__, us))
+        vs = array('i', map(remap.__getitem__, vs))
+        del remap
+        self._build_representation(representation, us, vs, ws)
+        return len(ws)
+
+    def _build_representation(self, representation, us, vs, ws):
+        # Constrói a estrutura escolhida a partir de arrays de arestas indexadas,
+        # numa única passada e sem o controle por aresta de _add_edge; os
+        # resultados derivados são invalidados uma vez, no fim.
+        self._meta = None
+        self._components = None
+        self._negative_arcs = set()
+        self.representation = representation
+        negative = len(ws) and min(ws) < 0
+        if representation == 'adj_matrix':
+            self._build_matrix(us, vs, ws, negative)
+        else:
+            if negative:
+                self._negative_arcs.update((i, j) for i, j, w in zip(us, vs, ws) if w < 0)
+            if representation == 'csr':
+                self._build_csr(us, vs, ws)
+            elif representation == 'bitset':
+                self._build_bitset(us, vs, ws)
+            else:
+                self._build_adj_list(us, vs, ws)
+        self._invalidate()
+        if representation in ('adj_list', 'csr'):
+            # Aqui cada aresta é guardada como veio, então a faixa de pesos sai
+            # direto de ws, sem percorrer a estrutura.
+            self._meta = {'edges': self._count_edges(), 'degree_histogram': self._count_degrees()}
+            self._set_weight_meta(*((min(ws), max(ws)) if len(ws) else (None, None)))
+        self.metadata()
+
+    def _build_adj_list(self, us, vs, ws):
+        names = [None] + [self.idx_to_node[i] for i in range(1, self.n+1)]
+        rows = [[] for _ in range(self.n+1)]
+        for i, j, w in zip(us, vs, ws):
+            rows[i].append((names[j], w))
+            rows[j].append((names[i], w))
+        self.adj_list = {names[i]: rows[i] for i in range(1, self.n+1)}
+
+    def _build_matrix(self, us, vs, ws, negative):
+        # Como em _add_edge, a matriz guarda uma só aresta por par: vale o
+        # último peso e, para as negativas, o último sentido listado.
+        matrix = self.adj_matrix = [[0.0]*(self.n+1) for _ in range(self.n+1)]
+        arcs = self._negative_arcs
+        for i, j, w in zip(us, vs, ws):
+            matrix[i][j] = w
+            matrix[j][i] = w
+            if negative:
+                arcs.discard((j, i))
+                arcs.discard((i, j))
+                if w < 0:
+                    arcs.add((i, j))
+
+    def _build_csr(self, us, vs, ws):
+        self.csr_offsets, self.csr_neighbors, self.csr_weights = _csr_from_edges(self.n, us, vs, ws)
+
+    def _build_bitset(self, us, vs, ws):
+        # Cada linha é um inteiro usado como bitset (bit j ligado se existe a
+        # aresta i-j). Pesos só são guardados se algum difere de 1.0, em um
+        # array por linha na ordem crescente dos vizinhos.
+        offsets, neighbors, weights = _csr_from_edges(self.n, us, vs, ws)
+        weighted = any(w != 1.0 for w in ws)
+        nbytes = self.n // 8 + 1
+        self.bit_rows = [0] * (self.n+1)
+        self.bit_weights = [array('d')] * (self.n+1) if weighted else None
+        for i in range(1, self.n+1):
+            start, end = offsets[i], offsets[i+1]
+            bits = bytearray(nbytes)
+            for j in neighbors[start:end]:
+                bits[j >> 3] |= 1 << (j & 7)
+            self.bit_rows[i] = int.from_bytes(bits, 'little')
+            if weighted:
+                # Como na matriz, o último peso de uma aresta repetida prevalece.
+                row = dict(zip(neighbors[start:end], weights[start:end]))
+                self.bit_weights[i] = array('d', (row[j] for j in sorted(row)))
+
+    def _iter_edges(self):
+        # Percorre cada aresta não direcionada uma única vez como (i, j, peso),
+        # com i <= j, usando a ordem dos índices em vez de um conjunto de vistas.
+        for i, row in self._edge_rows():
+            for j, w in row:
+                yield i, j, w
+
+    def _edge_rows(self):
+        # As arestas de _iter_edges agrupadas por vértice: pares (i, lista de
+        # (j, peso) com j >= i), na ordem da linha de i.
+        if self.representation == 'adj_matrix':
+            for i in range(1, self.n+1):
+                row = self.adj_matrix[i]
+                yield i, [(j, row[j]) for j in range(i, self.n+1) if row[j] != 0.0]
+            return
+        if self.representation == 'bitset':
+            for i in range(1, self.n+1):
+                yield i, [(j, w) for j, w in self._bitset_row(i) if i <= j]
+            return
+        offsets, neighbors, weights = self._index_csr()
+        for i in range(1, self.n+1):
+            start, end = offsets[i], offsets[i+1]
+            row, row_weights = neighbors[start:end], weights[start:end]
+            if i not in row:
+                yield i, [(j, w) for j, w in zip(row, row_weights) if j > i]
+                continue
+            edges = []
+            loop = False
+            for j, w in zip(row, row_weights):
+                if j == i:
+                    # Laços aparecem duas vezes na linha do vértice.
+                    loop = not loop
+                if i < j or (j == i and loop):
+                    edges.append((j, w))
+            yield i, edges
+
+    def save(self, path):
+        """
+        Salva o grafo em um snapshot binário versionado: tabela de nomes e os
+        arrays CSR (offsets, vizinhos e pesos), prontos para mapeamento em memória.
+        """
+        if self.representation == 'csr':
+            offsets, neighbors, weights = self.csr_offsets, self.csr_neighbors, self.csr_weights
+        else:
+            us, vs, ws = array('i'), array('i'), array('d')
+            for i, j, w in self._iter_edges():
+                us.append(i)
+                vs.append(j)
+                ws.append(w)
+            offsets, neighbors, weights = _csr_from_edges(self.n, us, vs, ws)
+        names = '\n'.join(self.idx_to_node[i] for i in range(1, self.n+1)).encode()
+        arcs = array('i', (k for arc in sorted(self._negative_arcs) for k in arc))
+        with open(path, 'wb') as f:
+            f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, _BYTE_ORDER,
+                                          self.n, len(neighbors), len(arcs) // 2, len(names)))
+            for section in (offsets, neighbors, weights, arcs):
+                f.write(memoryview(section).cast('B'))
+                f.write(bytes(-f.tell() % 8))
+            f.write(names)
+
+    @classmethod
+    def load(cls, path, mmap=True, representation='csr'):
+        """
+        Carrega um snapshot gravado por save(). Com mmap=True e representação
+        csr, os arrays são visões sobre o arquivo mapeado (sem cópia), e
+        processos que abrem o mesmo arquivo compartilham as mesmas páginas.
+        """
+        if representation not in _REPRESENTATIONS:
+            raise ValueError('Unsupported representation')
+        start = time.perf_counter()
+        buf = _map_file(path, mmap)
+        magic, version = _SNAPSHOT_HEADER_V1.unpack_from(buf)[:2]
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError(f'{path} não é um snapshot de grafo.')
+        if version == 1:
+            header = _SNAPSHOT_HEADER_V1
+            _, _, byte_order, n, nnz, names_len = header.unpack_from(buf)
+            num_arcs = 0
+        elif version == _SNAPSHOT_VERSION:
+            header = _SNAPSHOT_HEADER
+            _, _, byte_order, n, nnz, num_arcs, names_len = header.unpack_from(buf)
+        else:
+            raise ValueError(f'Versão de snapshot {version} não suportada.')
+        view = memoryview(buf)
+        pos = header.size
+        sections = []
+        for typecode, length in (('q', n + 2), ('i', nnz), ('d', nnz), ('i', 2 * num_arcs)):
+            size = array(typecode).itemsize * length
+            section = view[pos:pos + size].cast(typecode)
+            if byte_order != _BYTE_ORDER or not mmap:
+                section = array(typecode, section)
+                if byte_order != _BYTE_ORDER:
+                    section.byteswap()
+            sections.append(section)
+            pos += size + (-size % 8)
+        names = bytes(view[pos:pos + names_len]).decode().split('\n') if n else []
+        offsets, neighbors, weights, arcs = sections
+        # Snapshots antigos não guardam o sentido das arestas negativas; sem
+        # arcs, _from_csr adota o da ordem dos índices.
+        arcs = set(zip(arcs[0::2], arcs[1::2])) if version > 1 else None
+        return cls._from_csr(names, offsets, neighbors, weights, arcs, representation, start)
+
+    @classmethod
+    def from_csr(cls, names, offsets, neighbors, weights, representation='csr'):
+        """
+        Monta o grafo a partir de um CSR pronto no layout de csr_offsets,
+        csr_neighbors e csr_weights (linhas 1..n, cada aresta nas linhas dos
+        dois extremos), com names[i - 1] o nome do índice i. Os arrays podem
+        ser quaisquer objetos com protocolo de buffer contíguo em int64, int32
+        e float64 (por exemplo, arrays do NumPy) e são copiados para array.
+        Arestas negativas valem no sentido do menor para o maior índice.
+        """
+        if representation not in _REPRESENTATIONS:
+            raise ValueError('Unsupported representation')
+        start = time.perf_counter()
+        sections = []
+        for typecode, section in (('q', offsets), ('i', neighbors), ('d', weights)):
+            copy, view = array(typecode), memoryview(section)
+            if view.itemsize != copy.itemsize:
+                raise ValueError('Tipo de elemento incompatível com o layout CSR.')
+            copy.frombytes(view.cast('B'))
+            sections.append(copy)
+        if len(sections[0]) != len(names) + 2 or len(sections[1]) != len(sections[2]):
+            raise ValueError('CSR inconsistente com a lista de nomes.')
+        return cls._from_csr(names, *sections, None, representation, start)
+
+    @classmethod
+    def _from_csr(cls, names, offsets, neighbors, weights, negative_arcs, representation, start):
+        # Base comum de load e from_csr: monta o grafo sobre os arrays CSR já
+        # prontos e registra load_stats com o tempo contado desde start.
+        graph = cls.__new__(cls)
+        graph.n = len(names)
+        graph.node_to_idx = {name: i+1 for i, name in enumerate(names)}
+        graph.idx_to_node = {i+1: name for i, name in enumerate(names)}
+        graph.representation = 'csr'
+        graph.csr_offsets, graph.csr_neighbors, graph.csr_weights = offsets, neighbors, weights
+        if negative_arcs is None:
+            negative_arcs = {(i, j) for i, j, w in graph._iter_edges() if w < 0} if len(weights) and min(weights) < 0 else set()
+        graph._negative_arcs = negative_arcs
+        # Os metadados ficam para o primeiro uso, para não percorrer os
+        # arrays mapeados durante a abertura.
+        graph._meta = None
+        graph._components = None
+        graph._path_cache = None
+        graph._landmarks = None
+        graph._potentials = None
+        graph._index_cache = {}
+        if representation != 'csr':
+            us, vs, ws = array('i'), array('i'), array('d')
+            for i, j, w in graph._iter_edges():
+                us.append(i)
+                vs.append(j)
+                ws.append(w)
+            del graph.csr_offsets, graph.csr_neighbors, graph.csr_weights
+            graph._build_representation(representation, us, vs, ws)
+            graph._negative_arcs = negative_arcs
+        graph.load_stats = {
+            'vertices': graph.n,
+            'edges': len(neighbors) // 2,
+            'seconds': time.perf_counter() - start,
+            'peak_memory': None,
+        }
+        return graph
+
     def _add_edge(self, u, v, w):
+        meta = self._meta
+        if meta is not None:
+            i, j = self.node_to_idx[u], self.node_to_idx[v]
+            old = None if self.representation == 'adj_list' else self._edge_weight(i, j)
+            degrees = {i: self._degree(i), j: self._degree(j)}
         if self.representation == 'adj_list':
             self.adj_list[u].append((v, w))
             self.adj_list[v].append((u, w))
+        elif self.representation == 'csr':
+            raise ValueError('Representação csr não suporta inserção de arestas.')
+        elif self.representation == 'bitset':
+            i, j = self.node_to_idx[u], self.node_to_idx[v]
+            if self.bit_weights is None and w != 1.0:
+                self.bit_weights = [array('d', repeat(1.0, row.bit_count())) for row in self.bit_rows]
+            for a, b in ((i, j), (j, i)):
+                bit = 1 << b
+                if self.bit_weights is not None:
+                    rank = (self.bit_rows[a] & (bit - 1)).bit_count()
+                    if self.bit_rows[a] & bit:
+                        self.bit_weights[a][rank] = w
+                    else:
+                        self.bit_weights[a].insert(rank, w)
+                self.bit_rows[a] |= bit
         else:
             i, j = self.node_to_idx[u], self.node_to_idx[v]
             self.adj_matrix[i][j] = w
             self.adj_matrix[j][i] = w
+        if self.representation != 'adj_list':
+            # Matriz e bitset guardam uma só aresta por par: vale o último sentido.
+            self._negative_arcs.discard((self.node_to_idx[v], self.node_to_idx[u]))
+            self._negative_arcs.discard((self.node_to_idx[u], self.node_to_idx[v]))
+        if w < 0:
+            self._negative_arcs.add((self.node_to_idx[u], self.node_to_idx[v]))
+        self._invalidate()
+        if self._components is not None:
+            sets, elements = self._components
+            sets.union(elements[self.node_to_idx[u]], elements[self.node_to_idx[v]])
+        if meta is not None:
+            removed = self.representation == 'adj_matrix' and w == 0.0
+            self._note_edge_change(i, j, old, None if removed else w, degrees)
+
+    def add_vertex(self, name):
+        """
+        Acrescenta o vértice isolado name, com o próximo índice livre.
+        Histograma de graus e componentes rastreados são atualizados sem
+        recálculo; índices derivados (landmarks, caches) são descartados.
+        """
+        if self.representation == 'csr':
+            raise ValueError('Representação csr não suporta inserção de vértices.')
+        if name in self.node_to_idx:
+            raise ValueError(f'Vértice {name} já existe.')
+        self.n += 1
+        self.node_to_idx[name] = self.n
+        self.idx_to_node[self.n] = name
+        if self.representation == 'adj_list':
+            self.adj_list[name] = []
+        elif self.representation == 'bitset':
+            self.bit_rows.append(0)
+            if self.bit_weights is not None:
+                self.bit_weights.append(array('d'))
+        else:
+            for row in self.adj_matrix:
+                row.append(0.0)
+            self.adj_matrix.append([0.0] * (self.n+1))
+        self._invalidate()
+        if self._components is not None:
+            sets, elements = self._components
+            elements.append(len(sets))
+            sets.grow(len(sets) + 1)
+        if self._meta is not None:
+            hist = self._meta['degree_histogram']
+            hist[0] = hist.get(0, 0) + 1
+
+    def add_edge(self, u, v, w=1.0):
+        """
+        Insere a aresta u-v com peso w, criando os vértices que ainda não
+        existem. Matriz e bitset guardam uma aresta por par, então o peso de
+        uma aresta existente é substituído (na matriz, peso 0.0 equivale a
+        remove_edge). Número de arestas, histograma de graus e componentes
+        rastreados (ver component_labels) são atualizados sem recálculo.
+        """
+        if self.representation == 'csr':
+            raise ValueError('Representação csr não suporta inserção de arestas.')
+        for x in (u, v):
+            if x not in self.node_to_idx:
+                self.add_vertex(x)
+        w = float(w)
+        if self.representation == 'adj_matrix' and w == 0.0:
+            if self._edge_weight(self.node_to_idx[u], self.node_to_idx[v]) is not None:
+                self.remove_edge(u, v)
+            return
+        self._add_edge(u, v, w)
+
+    def remove_edge(self, u, v):
+        """
+        Remove uma aresta u-v (uma só, se houver paralelas) e retorna seu peso.
+        Os metadados são atualizados como em add_edge. Nos componentes
+        rastreados, uma busca alternada e limitada a partir de u e v decide se
+        a remoção separou o componente, e só o lado menor é rerrotulado.
+        """
+        if self.representation == 'csr':
+            raise ValueError('Representação csr não suporta remoção de arestas.')
+        i, j = self.node_to_idx[u], self.node_to_idx[v]
+        w = self._edge_weight(i, j)
+        if w is None:
+            raise ValueError(f'Aresta {u}-{v} não existe.')
+        if self._meta is not None:
+            degrees = {i: self._degree(i), j: self._degree(j)}
+        if self.representation == 'adj_list':
+            row = self.adj_list[u]
+            row.pop(next(k for k, (x, _) in enumerate(row) if x == v))
+            self.adj_list[v].remove((u, w))
+            remaining = self._edge_weight(i, j)
+        elif self.representation == 'bitset':
+            for a, b in ((i, j), (j, i)):
+                bit = 1 << b
+                if self.bit_rows[a] & bit:
+                    if self.bit_weights is not None:
+                        del self.bit_weights[a][(self.bit_rows[a] & (bit - 1)).bit_count()]
+                    self.bit_rows[a] &= ~bit
+            remaining = None
+        else:
+            self.adj_matrix[i][j] = 0.0
+            self.adj_matrix[j][i] = 0.0
+            remaining = None
+        if remaining is None or remaining >= 0:
+            self._negative_arcs.discard((i, j))
+            self._negative_arcs.discard((j, i))
+        self._invalidate()
+        if self._components is not None and remaining is None and i != j:
+            self._split_component(i, j)
+        if self._meta is not None:
+            self._note_edge_change(i, j, w, None, degrees)
+        return w
+
+    def _split_component(self, i, j):
+        # Após a remoção da última aresta i-j, expande buscas em largura a
+        # partir das duas pontas, sempre pelo lado que visitou menos vértices.
+        # Se elas se encontram, o componente continua inteiro; se um lado se
+        # esgota, seus vértices formam um componente novo e passam a elementos
+        # novos do union-find (os antigos ficam órfãos no conjunto original).
+        # Se as buscas passam de _SPLIT_SEARCH_LIMIT vértices sem decidir, o
+        # union-find é descartado e remontado na próxima consulta.
+        seen = ({i}, {j})
+        queues = (deque([i]), deque([j]))
+        while queues[0] and queues[1]:
+            if len(seen[0]) + len(seen[1]) > _SPLIT_SEARCH_LIMIT:
+                self._components = None
+                return
+            side = 0 if len(seen[0]) <= len(seen[1]) else 1
+            mine, other = seen[side], seen[1 - side]
+            for k, _ in self._row(queues[side].popleft()):
+                if k in other:
+                    return
+                if k not in mine:
+                    mine.add(k)
+                    queues[side].append(k)
+        part = seen[0] if not queues[0] else seen[1]
+        sets, elements = self._components
+        sets.size[sets.find(elements[i])] -= len(part)
+        root = len(sets)
+        sets.grow(root + len(part))
+        for x, k in enumerate(part, root):
+            elements[k] = x
+            sets.parent[x] = root
+        sets.size[root] = len(part)
+        sets.rank[root] = len(part) > 1
+        if len(sets) > 2 * (self.n+1):
+            self._compact_components()
+
+    def _compact_components(self):
+        # Recria o union-find só com os elementos em uso, um por vértice.
+        sets, elements = self._components
+        labels, sizes = sets.labels(elements[i] for i in range(1, self.n+1))
+        fresh = _DisjointSet(self.n+1)
+        roots = array('i', bytes(4 * len(sizes)))
+        for i in range(1, self.n+1):
+            c = labels[i]
+            if roots[c]:
+                fresh.parent[i] = roots[c]
+            else:
+                roots[c] = i
+                fresh.size[i] = sizes[c]
+                fresh.rank[i] = sizes[c] > 1
+        self._components = (fresh, array('i', range(self.n+1)))
+
+    def _edge_weight(self, i, j):
+        # Peso da aresta i-j, ou None se ela não existe.
+        if self.representation == 'adj_matrix':
+            w = self.adj_matrix[i][j]
+            return w if w != 0.0 else None
+        if self.representation == 'bitset':
+            row = self.bit_rows[i]
+            if not (row >> j) & 1:
+                return None
+            if self.bit_weights is None:
+                return 1.0
+            return self.bit_weights[i][(row & ((1 << j) - 1)).bit_count()]
+        for k, w in self._row(i):
+            if k == j:
+                return w
+        return None
+
+    def _row(self, i):
+        # Pares (índice do vizinho, peso) do vértice i.
+        if self.representation == 'adj_list':
+            idx = self.node_to_idx
+            return ((idx[v], w) for v, w in self.adj_list[self.idx_to_node[i]])
+        if self.representation == 'csr':
+            start, end = self.csr_offsets[i], self.csr_offsets[i+1]
+            return zip(self.csr_neighbors[start:end], self.csr_weights[start:end])
+        if self.representation == 'bitset':
+            return self._bitset_row(i)
+        row = self.adj_matrix[i]
+        return ((j, row[j]) for j in range(1, self.n+1) if row[j] != 0.0)
+
+    def _index_csr(self, reverse=None):
+        # Base das travessias: (offsets, vizinhos, pesos) em CSR sobre os
+        # índices de node_to_idx, com os vizinhos na ordem da representação.
+        # Em csr são os próprios arrays; nas demais é montado uma vez e
+        # descartado por _invalidate. Com reverse informado (False para os arcos
+        # que saem de cada vértice, True para os que chegam), as arestas
+        # negativas percorridas no sentido proibido recebem peso inf e nunca
+        # relaxam (ver negative_edges).
+        cache = self._index_cache
+        if self.representation == 'csr':
+            base = self.csr_offsets, self.csr_neighbors, self.csr_weights
+        else:
+            base = cache.get('base')
+            if base is None:
+                offsets = array('q', bytes(8 * (self.n+2)))
+                neighbors, weights = array('i'), array('d')
+                idx, names = self.node_to_idx, self.idx_to_node
+                for i in range(1, self.n+1):
+                    if self.representation == 'adj_list':
+                        row = self.adj_list[names[i]]
+                        neighbors.extend([idx[v] for v, _ in row])
+                        weights.extend([w for _, w in row])
+                    else:
+                        for j, w in self._row(i):
+                            neighbors.append(j)
+                            weights.append(w)
+                    offsets[i+1] = len(neighbors)
+                base = cache['base'] = (offsets, neighbors, weights)
+        if reverse is None or self.negative_edges == 'undirected' or not self._has_negative_weights():
+            return base
+        offsets, neighbors, weights = base
+        masked = cache.get(reverse)
+        if masked is None:
+            masked = cache[reverse] = array('d', weights)
+            arcs, inf = self._negative_arcs, float('inf')
+            for i in range(1, self.n+1):
+                for k in range(offsets[i], offsets[i+1]):
+                    if masked[k] < 0 and ((neighbors[k], i) if reverse else (i, neighbors[k])) not in arcs:
+                        masked[k] = inf
+        return offsets, neighbors, masked
+
+    def _degree(self, i):
+        if self.representation == 'adj_list':
+            return len(self.adj_list[self.idx_to_node[i]])
+        if self.representation == 'csr':
+            return self.csr_offsets[i+1] - self.csr_offsets[i]
+        if self.representation == 'bitset':
+            return self.bit_rows[i].bit_count()
+        return sum(1 for x in self.adj_matrix[i][1:] if x != 0.0)
+
+    def _note_edge_change(self, i, j, old, new, degrees):
+        # Atualiza os metadados em cache após a aresta i-j passar do peso old
+        # para new (None indica ausência), dados os graus anteriores.
+        meta = self._meta
+        hist = meta['degree_histogram']
+        for k, d in degrees.items():
+            hist[d] -= 1
+            if not hist[d]:
+                del hist[d]
+            d = self._degree(k)
+            hist[d] = hist.get(d, 0) + 1
+        if i != j or self.representation in ('adj_list', 'csr'):
+            meta['edges'] += (new is not None) - (old is not None)
+        if old is not None and old != new:
+            # O peso removido pode ter sido o mínimo ou o máximo.
+            self._weights_stale = True
+        elif new is not None and not self._weights_stale:
+            low = new if meta['min_weight'] is None else min(meta['min_weight'], new)
+            high = new if meta['max_weight'] is None else max(meta['max_weight'], new)
+            self._set_weight_meta(low, high)
+
+    def metadata(self):
+        """
+        Metadados mantidos em cache desde a carga: número de arestas, histograma
+        de graus, pesos mínimo e máximo e as flags 'unweighted' e
+        'negative_weights'. São atualizados a cada inserção de aresta.
+        """
+        if self._meta is None:
+            self._meta = {'edges': self._count_edges(), 'degree_histogram': self._count_degrees()}
+            self._weights_stale = True
+        if self._weights_stale:
+            self._set_weight_meta(*self._weight_range())
+        return self._meta
+
+    def _set_weight_meta(self, low, high):
+        self._meta['min_weight'] = low
+        self._meta['max_weight'] = high
+        self._meta['unweighted'] = low is None or low == high == 1.0
+        self._meta['negative_weights'] = low is not None and low < 0
+        self._weights_stale = False
 
     def num_edges(self):
+        return self.metadata()['edges']
+
+    def degree_distribution(self):
+        return dict(sorted(self.metadata()['degree_histogram'].items()))
+
+    def _count_edges(self):
         if self.representation == 'adj_list':
             return sum(len(neigh) for neigh in self.adj_list.values()) // 2
+        elif self.representation == 'csr':
+            return len(self.csr_neighbors) // 2
+        elif self.representation == 'bitset':
+            # Como na matriz, laços (diagonal) não entram na contagem.
+            rows = self.bit_rows
+            loops = sum((rows[i] >> i) & 1 for i in range(1, self.n+1))
+            return (sum(row.bit_count() for row in rows) - loops) // 2
         else:
             count = 0
             for i in range(1, self.n+1):
@@ -55,17 +1030,24 @@ class Graph:
                         count += 1
             return count
 
-    def degree_distribution(self):
+    def _count_degrees(self):
         dist = defaultdict(int)
         if self.representation == 'adj_list':
             for v in self.adj_list:
                 d = len(self.adj_list[v])
                 dist[d] += 1
+        elif self.representation == 'csr':
+            offsets = self.csr_offsets
+            for i in range(1, self.n+1):
+                dist[offsets[i+1] - offsets[i]] += 1
+        elif self.representation == 'bitset':
+            for i in range(1, self.n+1):
+                dist[self.bit_rows[i].bit_count()] += 1
         else:
             for i in range(1, self.n+1):
                 d = sum(1 for x in self.adj_matrix[i][1:] if x != 0.0)
                 dist[d] += 1
-        return dict(sorted(dist.items()))
+        return dict(dist)
 
     def average_degree(self):
         return 2 * self.num_edges() / self.n
@@ -80,29 +1062,115 @@ class Graph:
                 f.write(f"Grau {degree}: {count} vértice(s)\n")
 
     def _search(self, start, method='bfs'):
-        visited = set()
-        parent = {start: None}
-        level = {start: 0}
+        parent, level, order, count = self._traverse(self.node_to_idx[start], method)
+        # Os nomes só entram aqui, na saída, na ordem de descoberta.
+        names = self.idx_to_node
+        parents, levels = {}, {}
+        for k in range(count):
+            v = order[k]
+            parents[names[v]] = names[parent[v]] if parent[v] else None
+            levels[names[v]] = level[v]
+        return parents, levels
+
+    def _traverse(self, s, method='bfs'):
+        # BFS ou DFS a partir do índice s sobre arrays pré-alocados. Devolve
+        # parent (0 na raiz e nos não visitados), level (-1 nos não visitados)
+        # e os vértices visitados em order[:count], na ordem de descoberta.
+        if self.representation == 'bitset':
+            return self._bitset_traverse(s, method)
+        offsets, neighbors, _ = self._index_csr()
+        n = self.n
+        parent = array('i', bytes(4 * (n+1)))
+        level = array('i', [-1]) * (n+1)
+        order = array('i', bytes(4 * (n+1)))
+        level[s] = 0
+        order[0] = s
+        count = 1
         if method == 'bfs':
-            queue = deque([start])
-            while queue:
-                u = queue.popleft()
-                for v in self._neighbors(u):
-                    if v not in visited and v not in parent:
+            # order serve de fila: os vértices de order[head:count] aguardam.
+            head = 0
+            while head < count:
+                u = order[head]
+                head += 1
+                d = level[u] + 1
+                for k in range(offsets[u], offsets[u+1]):
+                    v = neighbors[k]
+                    if level[v] < 0:
                         parent[v] = u
-                        level[v] = level[u] + 1
-                        queue.append(v)
-                visited.add(u)
+                        level[v] = d
+                        order[count] = v
+                        count += 1
         else:
-            def dfs(u):
-                visited.add(u)
-                for v in self._neighbors(u):
-                    if v not in visited:
+            # DFS iterativa: a pilha guarda o caminho atual e cursor o próximo
+            # arco de cada vértice, o que reproduz a ordem da versão recursiva
+            # sem esbarrar no limite de recursão.
+            stack = array('i', bytes(4 * (n+1)))
+            cursor = array('q', offsets)
+            stack[0] = s
+            top = 1
+            while top:
+                u = stack[top-1]
+                k = cursor[u]
+                if k < offsets[u+1]:
+                    cursor[u] = k + 1
+                    v = neighbors[k]
+                    if level[v] < 0:
                         parent[v] = u
                         level[v] = level[u] + 1
-                        dfs(v)
-            dfs(start)
-        return parent, level
+                        order[count] = v
+                        count += 1
+                        stack[top] = v
+                        top += 1
+                else:
+                    top -= 1
+        return parent, level, order, count
+
+    def _bitset_traverse(self, s, method):
+        # _traverse sobre as linhas do bitset, sem montar o CSR: os vizinhos
+        # ainda não visitados de u saem de uma única operação rows[u] & unseen.
+        # Na BFS eles entram todos de uma vez; na DFS o próximo é o menor bit,
+        # o mesmo vizinho que o cursor em ordem crescente escolheria.
+        rows, n = self.bit_rows, self.n
+        parent = array('i', bytes(4 * (n+1)))
+        level = array('i', [-1]) * (n+1)
+        order = array('i', bytes(4 * (n+1)))
+        level[s] = 0
+        order[0] = s
+        count = 1
+        unseen = ((1 << (n+1)) - 2) & ~(1 << s)
+        if method == 'bfs':
+            head = 0
+            while head < count:
+                u = order[head]
+                head += 1
+                new = rows[u] & unseen
+                if new:
+                    unseen ^= new
+                    d = level[u] + 1
+                    for v in _bit_positions(new):
+                        parent[v] = u
+                        level[v] = d
+                        order[count] = v
+                        count += 1
+        else:
+            stack = array('i', bytes(4 * (n+1)))
+            stack[0] = s
+            top = 1
+            while top:
+                u = stack[top-1]
+                new = rows[u] & unseen
+                if new:
+                    v = (new & -new).bit_length() - 1
+                    unseen ^= 1 << v
+                    parent[v] = u
+                    level[v] = level[u] + 1
+                    order[count] = v
+                    count += 1
+                    stack[top] = v
+                    top += 1
+                else:
+                    top -= 1
+        return parent, level, order, count
 
     def bfs(self, start):
         return self._search(start, 'bfs')
@@ -110,202 +1178,805 @@ class Graph:
     def dfs(self, start):
         return self._search(start, 'dfs')
 
-    def write_search_tree(self, start, method, out_filepath):
-        parent, level = getattr(self, method)(start)
+    def write_search_tree(self, start, method, out_filepath, format='text'):
+        """
+        Grava pai e nível de cada vértice na árvore de busca ('bfs' ou 'dfs')
+        a partir de start. format='text' mantém o layout "vértice pai nível";
+        format='npy' grava registros (parent, level) int32 indexados por
+        node_to_idx, com parent 0 e level -1 nos não visitados.
+        """
+        if method not in ('bfs', 'dfs'):
+            raise ValueError('Unsupported method')
+        parent, level, _, _ = self._traverse(self.node_to_idx[start], method)
+        if format == 'npy':
+            records = array('i', bytes(8 * (self.n+1)))
+            records[0::2] = parent
+            records[1::2] = level
+            _write_npy(out_filepath, [('parent', _BYTE_ORDER.decode() + 'i4'),
+                                      ('level', _BYTE_ORDER.decode() + 'i4')], 8, [records])
+            return
+        if format != 'text':
+            raise ValueError('Unsupported format')
+        names = [None] + [self.idx_to_node[i] for i in range(1, self.n+1)]
         with open(out_filepath, 'w', encoding='utf-8') as f:
             f.write("Vértice / pai / nível:\n")
-            for v in self.adj_list.keys() if self.representation == 'adj_list' else self.idx_to_node.values():
-                p = parent.get(v, None)
-                l = level.get(v, -1)
-                f.write(f"{v} {p} {l}\n")
+            for batch in _batches(range(1, self.n+1)):
+                f.write(''.join([f"{names[i]} {names[parent[i]]} {level[i]}\n" for i in batch]))
 
     def connected_components(self):
-        visited = set()
+        if self.representation == 'bitset':
+            return self._bitset_components()
+        offsets, neighbors, _ = self._index_csr()
+        names = self.idx_to_node
+        seen = bytearray(self.n+1)
+        stack = array('i', bytes(4 * (self.n+1)))
         components = []
-        nodes = list(self.adj_list.keys()) if self.representation == 'adj_list' else list(self.idx_to_node.values())
-        for v in nodes:
-            if v not in visited:
+        for s in range(1, self.n+1):
+            if not seen[s]:
                 comp = []
-                stack = [v]
-                visited.add(v)
-                while stack:
-                    u = stack.pop()
-                    comp.append(u)
-                    for w in self._neighbors(u):
-                        if w not in visited:
-                            visited.add(w)
-                            stack.append(w)
+                seen[s] = 1
+                stack[0] = s
+                top = 1
+                while top:
+                    top -= 1
+                    u = stack[top]
+                    comp.append(names[u])
+                    for k in range(offsets[u], offsets[u+1]):
+                        v = neighbors[k]
+                        if not seen[v]:
+                            seen[v] = 1
+                            stack[top] = v
+                            top += 1
                 components.append(comp)
         components.sort(key=lambda c: len(c), reverse=True)
         return components
 
-    def write_components(self, out_filepath):
+    def _bitset_components(self):
+        names = self.idx_to_node
+        components = [[names[v] for v in _bit_positions(comp)] for comp in self._bitset_component_masks()]
+        components.sort(key=lambda c: len(c), reverse=True)
+        return components
+
+    def _bitset_component_masks(self):
+        # Expande cada componente por fronteiras: o alcance da fronteira é o OR
+        # das suas linhas, e os novos vértices são reach & ~comp.
+        rows = self.bit_rows
+        remaining = (1 << (self.n+1)) - 2
+        while remaining:
+            comp = frontier = remaining & -remaining
+            while frontier:
+                reach = 0
+                for u in _bit_positions(frontier):
+                    reach |= rows[u]
+                frontier = reach & ~comp
+                comp |= frontier
+            remaining &= ~comp
+            yield comp
+
+    def component_labels(self):
+        """
+        Componentes conexos por union-find sobre as arestas, como Components:
+        rótulos e tamanhos em arrays, sem listas de nomes por componente. O
+        union-find é mantido daí em diante pelas alterações do grafo, e as
+        chamadas seguintes só rerrotulam.
+        """
+        sets, elements = self._tracked_components()
+        labels, sizes = sets.labels(elements[i] for i in range(1, self.n+1))
+        return Components(labels, sizes, self.node_to_idx, self.idx_to_node)
+
+    def connected(self, u, v):
+        """Se u e v estão no mesmo componente, pelo union-find rastreado."""
+        sets, elements = self._tracked_components()
+        return sets.find(elements[self.node_to_idx[u]]) == sets.find(elements[self.node_to_idx[v]])
+
+    def _tracked_components(self):
+        # Union-find dos componentes e o elemento de cada vértice nele. Uma vez
+        # montado, é mantido por add_edge, remove_edge e add_vertex.
+        if self._components is None:
+            sets = _DisjointSet(self.n+1)
+            if self.representation == 'bitset':
+                # Cada componente sai inteiro da expansão por bitsets e vira
+                # uma estrela com raiz no menor vértice.
+                for comp in self._bitset_component_masks():
+                    root = (comp & -comp).bit_length() - 1
+                    for v in _bit_positions(comp ^ (1 << root)):
+                        sets.parent[v] = root
+                    sets.size[root] = comp.bit_count()
+                    sets.rank[root] = sets.size[root] > 1
+            else:
+                offsets, neighbors, _ = self._index_csr()
+                for i in range(1, self.n+1):
+                    start, end = offsets[i], offsets[i+1]
+                    sets.union_edges(repeat(i, end - start), neighbors[start:end])
+            self._components = (sets, array('i', range(self.n+1)))
+        return self._components
+
+    @staticmethod
+    def components_from_file(data_path, chunk_size=_CHUNK_SIZE):
+        """
+        Como component_labels, mas direto do arquivo de arestas, sem construir
+        o grafo: cada bloco lido é unido no union-find e descartado, então a
+        memória depende do número de vértices e não do de arestas. Os índices
+        seguem a mesma ordem dos nomes usada pelo carregador.
+        """
+        intern = _Interner()
+        sets = _DisjointSet()
+
+        def consume(chunk):
+            us, vs, ws = array('i'), array('i'), array('d')
+            _parse_edge_chunk(chunk, intern, us, vs, ws)
+            sets.grow(len(intern))
+            sets.union_edges(us, vs)
+
+        declared = _scan_edge_file(data_path, consume, chunk_size)
+        if len(intern) > declared:
+            raise ValueError(f'Cabeçalho declara {declared} vértices, mas o arquivo contém {len(intern)}.')
+        unique_nodes = sorted(intern)
+        node_to_idx = {}
+        idx_to_node = {}
+        for i, raw in enumerate(unique_nodes, 1):
+            name = raw.decode()
+            node_to_idx[name] = i
+            idx_to_node[i] = name
+        labels, sizes = sets.labels(intern[raw] for raw in unique_nodes)
+        return Components(labels, sizes, node_to_idx, idx_to_node)
+
+    def write_components(self, out_filepath, format='text'):
+        """
+        Grava os componentes conexos. format='text' mantém o layout com o
+        tamanho e os membros de cada componente; format='npy' grava só o
+        rótulo int32 de cada vértice (ver component_labels), indexado por
+        node_to_idx, sem montar listas de membros.
+        """
+        if format == 'npy':
+            labels = self.component_labels().labels
+            _write_npy(out_filepath, _BYTE_ORDER.decode() + 'i4', 4, [labels])
+            return
+        if format != 'text':
+            raise ValueError('Unsupported format')
         comps = self.connected_components()
         with open(out_filepath, 'w', encoding='utf-8') as f:
             f.write(f"Número de componentes: {len(comps)}\n")
-            for comp in comps:
-                f.write(f"Tamanho: {len(comp)} [{' '.join(map(str, comp))}]\n")
+            for batch in _batches(comps, 1024):
+                f.write(''.join([f"Tamanho: {len(comp)} [{' '.join(map(str, comp))}]\n" for comp in batch]))
 
-    def _neighbors(self, u):
-        if self.representation == 'adj_list':
-            return [v for v, w in self.adj_list[u]]
-        else:
-            idx = self.node_to_idx[u]
-            return [self.idx_to_node[i] for i, val in enumerate(self.adj_matrix[idx]) if val != 0.0 and i != 0]
-
-    def _neighbors_with_weights(self, u):
-        if self.representation == 'adj_list':
-            return self.adj_list[u]
-        else:
-            idx = self.node_to_idx[u]
-            return [(self.idx_to_node[i], self.adj_matrix[idx][i]) for i in range(1, self.n+1) if self.adj_matrix[idx][i] != 0.0]
+    def _bitset_row(self, i):
+        positions = _bit_positions(self.bit_rows[i])
+        if self.bit_weights is None:
+            return zip(positions, repeat(1.0))
+        return zip(positions, self.bit_weights[i])
 
-    def write_edges(self, out_filepath):
+    def write_edges(self, out_filepath, format='text'):
+        """
+        Grava cada aresta uma única vez, na ordem dos índices (u antes de v),
+        sem guardar as já escritas. format='text' mantém o layout "u v peso";
+        format='npy' grava registros (u, v, w) com os índices de node_to_idx
+        (int32, int32, float64). Como na matriz, matriz e bitset omitem laços.
+        """
+        rows = self._edge_rows()
+        if self.representation in ('adj_matrix', 'bitset'):
+            rows = ((i, [(j, w) for j, w in row if j != i]) for i, row in rows)
+        if format == 'npy':
+            order = _BYTE_ORDER.decode()
+            _write_npy(out_filepath, [('u', order + 'i4'), ('v', order + 'i4'), ('w', order + 'f8')],
+                       16, self._edge_records(rows))
+            return
+        if format != 'text':
+            raise ValueError('Unsupported format')
+        names = [None] + [self.idx_to_node[i] for i in range(1, self.n+1)]
         with open(out_filepath, 'w', encoding='utf-8') as f:
             f.write("Arestas (u, v, peso):\n")
-            if self.representation == 'adj_list':
-                written = set()
-                for u in self.adj_list:
-                    for v, w in self.adj_list[u]:
-                        if (v, u) not in written:
-                            f.write(f"{u} {v} {w}\n")
-                            written.add((u, v))
-            else:
-                for i in range(1, self.n+1):
-                    for j in range(i+1, self.n+1):
-                        w = self.adj_matrix[i][j]
-                        if w != 0.0:
-                            f.write(f"{self.idx_to_node[i]} {self.idx_to_node[j]} {w}\n")
+            lines = []
+            for i, row in rows:
+                u = names[i]
+                lines += [f"{u} {names[j]} {w}\n" for j, w in row]
+                if len(lines) >= _EXPORT_BLOCK:
+                    f.write(''.join(lines))
+                    lines.clear()
+            f.write(''.join(lines))
 
-    def _has_negative_weights(self):
+    def _edge_records(self, rows):
+        # Blocos de registros de 16 bytes (u int32, v int32, w float64): cada
+        # registro ocupa quatro int32, os dois últimos com os bytes do peso.
+        us, vs, ws = array('i'), array('i'), array('d')
+        for i, row in rows:
+            us.extend(repeat(i, len(row)))
+            vs.extend([j for j, _ in row])
+            ws.extend([w for _, w in row])
+            if len(us) >= _EXPORT_BLOCK or i == self.n and us:
+                weights = array('i', memoryview(ws).cast('B').cast('i'))
+                records = array('i', bytes(16 * len(us)))
+                records[0::4] = us
+                records[1::4] = vs
+                records[2::4] = weights[0::2]
+                records[3::4] = weights[1::2]
+                yield records
+                us, vs, ws = array('i'), array('i'), array('d')
+
+    def _weight_range(self):
+        # Menor e maior peso entre as arestas, ou (None, None) sem arestas.
         if self.representation == 'adj_list':
-            for u in self.adj_list:
-                for v, w in self.adj_list[u]:
-                    if w < 0:
-                        return True
+            weights = [w for row in self.adj_list.values() for v, w in row]
+        elif self.representation == 'csr':
+            weights = self.csr_weights
+        elif self.representation == 'bitset':
+            if self.bit_weights is None:
+                return (1.0, 1.0) if any(self.bit_rows) else (None, None)
+            weights = [w for row in self.bit_weights for w in row]
         else:
-            for i in range(1, self.n+1):
-                for j in range(1, self.n+1):
-                    if self.adj_matrix[i][j] < 0:
-                        return True
-        return False
+            weights = [x for row in self.adj_matrix for x in row if x != 0.0]
+        if not len(weights):
+            return None, None
+        return min(weights), max(weights)
+
+    def _has_negative_weights(self):
+        return self.metadata()['negative_weights']
 
     def _is_unweighted(self):
-        if self.representation == 'adj_list':
-            for u in self.adj_list:
-                for v, w in self.adj_list[u]:
-                    if w != 1.0:
-                        return False
-        else:
-            for i in range(1, self.n+1):
-                for j in range(1, self.n+1):
-                    if i != j and self.adj_matrix[i][j] not in (0.0, 1.0):
-                        return False
-        return True
+        return self.metadata()['unweighted']
 
-    def shortest_path(self, source, target):
+    def _spfa(self, sources, reverse=False):
+        # Bellman-Ford com fila (SPFA) a partir das distâncias iniciais em
+        # sources ({índice: distância}). Um caminho com n arestas ou mais
+        # denuncia um ciclo negativo. Devolve (dist, parent) como _sssp.
+        n = self.n
+        offsets, neighbors, weights = self._index_csr(reverse)
+        dist = array('d', [float('inf')]) * (n+1)
+        parent = array('i', bytes(4 * (n+1)))
+        edges = array('i', bytes(4 * (n+1)))
+        queued = bytearray(n+1)
+        for s, d in sources.items():
+            dist[s] = d
+            queued[s] = 1
+        queue = deque(sources)
+        while queue:
+            u = queue.popleft()
+            queued[u] = 0
+            du = dist[u]
+            for k in range(offsets[u], offsets[u+1]):
+                v = neighbors[k]
+                d = du + weights[k]
+                # Ganhos abaixo do erro de arredondamento não contam, senão
+                # um ciclo de peso zero com pesos decimais (-0.8, -1.6, 2.4)
+                # somaria -4.4e-16 e seria tomado por ciclo negativo.
+                if dist[v] - d > _RELAX_TOLERANCE * (1.0 + abs(d)):
+                    dist[v] = d
+                    parent[v] = u
+                    edges[v] = edges[u] + 1
+                    if edges[v] >= n:
+                        raise ValueError(f'Grafo possui ciclo de peso negativo (detectado no vértice {self.idx_to_node[v]}).')
+                    if not queued[v]:
+                        queued[v] = 1
+                        queue.append(v)
+        return dist, parent
+
+    def johnson_reweight(self):
+        """
+        Calcula (uma única vez, até a próxima alteração do grafo) os potenciais
+        de Johnson p, com os quais w(u, v) + p(u) - p(v) >= 0 em todos os arcos.
+        A partir daí as buscas com pesos negativos usam Dijkstra em vez de SPFA.
+        """
+        if self._potentials is None:
+            potentials, _ = self._spfa(dict.fromkeys(range(1, self.n+1), 0.0))
+            potentials[0] = 0.0
+            self._potentials = potentials
+        return self._potentials
+
+    def _sssp(self, s, targets=None, reverse=False):
+        # Caminhos mínimos a partir do índice s (ou até ele, com reverse=True):
+        # BFS se o grafo não tem pesos, Dijkstra caso contrário. Com pesos
+        # negativos usa SPFA, ou Dijkstra sobre os pesos reponderados quando os
+        # potenciais de Johnson já foram calculados. Devolve arrays indexados
+        # (dist, parent): dist com -1 (BFS) ou inf nos inalcançáveis, parent
+        # com 0 na origem e nos inalcançáveis. Se targets (índices) for
+        # informado, para assim que todos são fixados; as distâncias dos
+        # demais vértices podem então ser provisórias.
+        n = self.n
+        pending = set(targets) if targets is not None else None
+        parent = array('i', bytes(4 * (n+1)))
+        bitset = self.representation == 'bitset'
+        if self._is_unweighted() and bitset:
+            parent, dist, _, _ = self._bitset_traverse(s, 'bfs')
+            return dist, parent
         if self._is_unweighted():
-            queue = deque([source])
-            visited = {source}
-            parent = {source: None}
-            dist = {source: 0}
-            while queue:
-                u = queue.popleft()
-                if u == target:
-                    break
-                for v in self._neighbors(u):
-                    if v not in visited:
-                        visited.add(v)
+            offsets, neighbors, _ = self._index_csr()
+            dist = array('i', [-1]) * (n+1)
+            queue = array('i', bytes(4 * (n+1)))
+            dist[s] = 0
+            queue[0] = s
+            head, tail = 0, 1
+            while head < tail:
+                u = queue[head]
+                head += 1
+                if pending is not None:
+                    pending.discard(u)
+                    if not pending:
+                        break
+                d = dist[u] + 1
+                for k in range(offsets[u], offsets[u+1]):
+                    v = neighbors[k]
+                    if dist[v] < 0:
+                        dist[v] = d
                         parent[v] = u
-                        dist[v] = dist[u] + 1
-                        queue.append(v)
-            if target not in dist:
-                return float('inf'), []
-            
-            path = []
-            v = target
-            while v is not None:
-                path.append(v)
-                v = parent[v]
-            path.reverse()
-            return round(dist[target], 6), path
-        else:
-            if self._has_negative_weights():
-                raise ValueError('Grafo possui pesos negativos, Dijkstra não pode ser usado.')
-            heap = [(0.0, source, None)]
-            dist = {source: 0.0}
-            parent = {source: None}
-            visited = set()
-            while heap:
-                d, u, p = heapq.heappop(heap)
-                if u in visited:
-                    continue
-                visited.add(u)
-                parent[u] = p
-                if u == target:
+                        queue[tail] = v
+                        tail += 1
+            return dist, parent
+        potentials = None
+        if self._has_negative_weights():
+            if self._potentials is None:
+                return self._spfa({s: 0.0}, reverse)
+            potentials = self._potentials
+            sign = -1.0 if reverse else 1.0
+        # No bitset (sem arcos negativos) cada linha é lida direto das linhas
+        # de bits e dos pesos, sem montar o CSR.
+        bitset = bitset and potentials is None
+        if not bitset:
+            offsets, neighbors, weights = self._index_csr(reverse)
+        inf = float('inf')
+        dist = array('d', [inf]) * (n+1)
+        done = bytearray(n+1)
+        dist[s] = 0.0
+        heap = [(0.0, s)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            if pending is not None:
+                pending.discard(u)
+                if not pending:
                     break
-                for v, w in self._neighbors_with_weights(u):
-                    if v not in dist or dist[v] > d + w:
+            if bitset:
+                for v, w in self._bitset_row(u):
+                    if d + w < dist[v] and not done[v]:
                         dist[v] = d + w
-                        heapq.heappush(heap, (dist[v], v, u))
-            if target not in dist:
-                return float('inf'), []
-            path = []
-            v = target
-            while v is not None:
-                path.append(v)
-                v = parent[v]
-            path.reverse()
-            return round(dist[target], 6), path
-
-    def all_shortest_paths(self, source):
-        if self._is_unweighted():
-            queue = deque([source])
-            visited = {source}
-            parent = {source: None}
-            dist = {source: 0}
-            while queue:
-                u = queue.popleft()
-                for v in self._neighbors(u):
-                    if v not in visited:
-                        visited.add(v)
                         parent[v] = u
-                        dist[v] = dist[u] + 1
-                        queue.append(v)
-            paths = {}
-            for v in dist:
-                path = []
-                x = v
-                while x is not None:
-                    path.append(x)
-                    x = parent[x]
-                path.reverse()
-                paths[v] = (round(dist[v], 6), path)
-            return paths
+                        heapq.heappush(heap, (d + w, v))
+                continue
+            for k in range(offsets[u], offsets[u+1]):
+                v = neighbors[k]
+                w = weights[k]
+                if potentials is not None:
+                    w += sign * (potentials[u] - potentials[v])
+                if d + w < dist[v] and not done[v]:
+                    dist[v] = d + w
+                    parent[v] = u
+                    heapq.heappush(heap, (d + w, v))
+        if potentials is not None:
+            # Desfaz a reponderação: d(s, v) = d'(s, v) - p(s) + p(v).
+            ps = potentials[s]
+            for v in range(1, n+1):
+                if dist[v] != inf:
+                    dist[v] -= sign * (ps - potentials[v])
+        return dist, parent
+
+    def _index_path(self, parent, t):
+        # Nomes do caminho até o índice t, seguindo parent até a origem (0).
+        names = self.idx_to_node
+        path = [names[t]]
+        while parent[t]:
+            t = parent[t]
+            path.append(names[t])
+        path.reverse()
+        return path
+
+    def enable_path_cache(self, max_bytes=64 * 1024 * 1024):
+        """
+        Ativa o cache de árvores de caminhos mínimos por origem. Cada árvore
+        guarda apenas arrays de predecessores e distâncias; as menos usadas
+        recentemente são descartadas quando o total passa de max_bytes.
+        """
+        self._path_cache = OrderedDict()
+        self._path_cache_bytes = 0
+        self._path_cache_max_bytes = max_bytes
+        self._path_cache_hits = self._path_cache_misses = 0
+
+    def disable_path_cache(self):
+        self._path_cache = None
+
+    def path_cache_info(self):
+        if self._path_cache is None:
+            return None
+        return {
+            'hits': self._path_cache_hits,
+            'misses': self._path_cache_misses,
+            'entries': len(self._path_cache),
+            'bytes': self._path_cache_bytes,
+            'max_bytes': self._path_cache_max_bytes,
+        }
+
+    def _invalidate(self):
+        # Chamado a cada alteração do grafo: resultados derivados deixam de valer.
+        self._landmarks = None
+        self._potentials = None
+        self._index_cache.clear()
+        if self._path_cache:
+            self._path_cache.clear()
+            self._path_cache_bytes = 0
+
+    def _cached_tree(self, source):
+        cache = self._path_cache
+        s = self.node_to_idx[source]
+        tree = cache.get(s)
+        if tree is not None:
+            cache.move_to_end(s)
+            self._path_cache_hits += 1
+            return tree
+        self._path_cache_misses += 1
+        # Predecessor 0 marca a origem e os vértices inalcançáveis; a distância
+        # -1 (BFS) ou inf (Dijkstra) marca os inalcançáveis.
+        dists, parents = self._sssp(s)
+        tree = (parents, dists)
+        size = parents.itemsize * len(parents) + dists.itemsize * len(dists)
+        if size <= self._path_cache_max_bytes:
+            cache[s] = tree
+            self._path_cache_bytes += size
+            while self._path_cache_bytes > self._path_cache_max_bytes:
+                _, (p, d) = cache.popitem(last=False)
+                self._path_cache_bytes -= p.itemsize * len(p) + d.itemsize * len(d)
+        return tree
+
+    def _tree_path(self, tree, target):
+        parents, dists = tree
+        t = self.node_to_idx[target]
+        d = dists[t]
+        if not _reached(dists, d):
+            return float('inf'), []
+        return round(d, 6), self._index_path(parents, t)
+
+    def _bidirectional_bfs(self, s, t):
+        # Expande por níveis o lado com a menor fronteira; ao completar o nível
+        # em que as buscas se encontram, o menor encontro é o caminho mínimo.
+        # Devolve (distância, índice do encontro ou 0, arrays parent dos lados).
+        offsets, neighbors, _ = self._index_csr()
+        n = self.n
+        dist = (array('i', [-1]) * (n+1), array('i', [-1]) * (n+1))
+        parent = (array('i', bytes(4 * (n+1))), array('i', bytes(4 * (n+1))))
+        dist[0][s] = dist[1][t] = 0
+        frontier = [[s], [t]]
+        best, meet = (0, s) if s == t else (float('inf'), 0)
+        while not meet and frontier[0] and frontier[1]:
+            side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+            mine, other, links = dist[side], dist[1 - side], parent[side]
+            next_frontier = []
+            for u in frontier[side]:
+                d = mine[u] + 1
+                for k in range(offsets[u], offsets[u+1]):
+                    v = neighbors[k]
+                    if mine[v] < 0:
+                        mine[v] = d
+                        links[v] = u
+                        next_frontier.append(v)
+                        if other[v] >= 0 and d + other[v] < best:
+                            best, meet = d + other[v], v
+            frontier[side] = next_frontier
+        return best, meet, parent
+
+    def _bidirectional_dijkstra(self, s, t):
+        # Dijkstra simultâneo a partir das duas pontas. Para quando a soma dos
+        # topos das filas não pode mais melhorar o melhor encontro (mu). Com
+        # pesos negativos, as duas buscas usam os pesos reponderados de Johnson.
+        potentials = None
+        if self._has_negative_weights():
+            potentials = self.johnson_reweight()
+        offsets, neighbors, forward = self._index_csr(False)
+        weights = (forward, self._index_csr(True)[2])
+        n = self.n
+        inf = float('inf')
+        dist = (array('d', [inf]) * (n+1), array('d', [inf]) * (n+1))
+        parent = (array('i', bytes(4 * (n+1))), array('i', bytes(4 * (n+1))))
+        settled = (bytearray(n+1), bytearray(n+1))
+        dist[0][s] = dist[1][t] = 0.0
+        heaps = ([(0.0, s)], [(0.0, t)])
+        best, meet = (0.0, s) if s == t else (inf, 0)
+        while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            mine, other, links, row = dist[side], dist[1 - side], parent[side], weights[side]
+            d, u = heapq.heappop(heaps[side])
+            if settled[side][u]:
+                continue
+            settled[side][u] = 1
+            for k in range(offsets[u], offsets[u+1]):
+                v = neighbors[k]
+                w = row[k]
+                if potentials is not None:
+                    w += (1.0 - 2.0 * side) * (potentials[u] - potentials[v])
+                if d + w < mine[v]:
+                    mine[v] = d + w
+                    links[v] = u
+                    heapq.heappush(heaps[side], (mine[v], v))
+                if mine[v] + other[v] < best:
+                    best, meet = mine[v] + other[v], v
+        if potentials is not None and meet:
+            best -= potentials[s] - potentials[t]
+        return best, meet, parent
+
+    def build_landmarks(self, k=8, typecode='d'):
+        """
+        Constrói o índice ALT: escolhe k landmarks (cada um o vértice mais
+        distante dos já escolhidos) e guarda as distâncias de cada landmark a
+        todos os vértices. typecode='f' guarda as distâncias em float32, com
+        metade da memória e limites inferiores um pouco mais frouxos.
+
+        Com pesos negativos as buscas usam os potenciais de Johnson, e como os
+        arcos negativos têm sentido, guarda também as distâncias até cada landmark.
+        """
+        if typecode not in ('d', 'f'):
+            raise ValueError("typecode deve ser 'd' ou 'f'.")
+        directed = self._has_negative_weights()
+        if directed:
+            self.johnson_reweight()
+        inf = float('inf')
+        landmarks = array('i')
+        forward, backward = [], []
+        # A primeira busca parte de um vértice qualquer só para achar o mais
+        # distante. Depois, closest guarda a distância ao landmark mais próximo,
+        # com -inf nos já escolhidos.
+        closest = array('d', (d if d != inf else -inf for d in self._distance_vector(1)))
+        closest[0] = -inf
+        while len(landmarks) < min(k, self.n):
+            candidate = max(range(1, self.n+1), key=closest.__getitem__)
+            if closest[candidate] == -inf:
+                break
+            dist = self._distance_vector(candidate)
+            if not landmarks:
+                closest = array('d', [inf]) * (self.n+1)
+                closest[0] = -inf
+            for i in range(1, self.n+1):
+                if dist[i] < closest[i]:
+                    closest[i] = dist[i]
+            closest[candidate] = -inf
+            landmarks.append(candidate)
+            forward.append(array(typecode, dist))
+            if directed:
+                backward.append(array(typecode, self._distance_vector(candidate, reverse=True)))
+        finite = [abs(d) for vector in forward + backward for d in vector if d != inf]
+        self._set_landmarks(landmarks, forward, backward if directed else None,
+                            max(finite, default=0.0), typecode)
+
+    def _distance_vector(self, i, reverse=False):
+        # Distâncias a partir do vértice i (ou até ele) em um array indexado,
+        # com inf para os inalcançáveis.
+        dist, _ = self._sssp(i, reverse=reverse)
+        if dist.typecode == 'd':
+            return dist
+        inf = float('inf')
+        return array('d', (d if d >= 0 else inf for d in dist))
+
+    def _set_landmarks(self, landmarks, forward, backward, longest, typecode):
+        # Em float32 cada distância pode ter arredondado até longest * 2^-24
+        # para cima; o limite inferior desconta esse erro para seguir admissível.
+        # Sem arcos negativos as distâncias são simétricas e backward = forward.
+        slack = longest * 2.0 ** -23 if typecode == 'f' else 0.0
+        self._landmarks = (landmarks, forward, backward or forward, slack, longest)
+
+    def save_landmarks(self, path):
+        if self._landmarks is None:
+            raise ValueError('Índice de landmarks não construído.')
+        landmarks, forward, backward, slack, longest = self._landmarks
+        typecode = forward[0].typecode.encode() if forward else b'd'
+        directed = backward is not forward
+        with open(path, 'wb') as f:
+            f.write(_LANDMARKS_HEADER.pack(_LANDMARKS_MAGIC, _LANDMARKS_VERSION, typecode,
+                                           _BYTE_ORDER, directed, self.n, len(landmarks), longest))
+            for section in (landmarks, *forward, *(backward if directed else ())):
+                f.write(memoryview(section).cast('B'))
+                f.write(bytes(-f.tell() % 8))
+
+    def load_landmarks(self, path, mmap=True):
+        buf = _map_file(path, mmap)
+        magic, version, typecode, byte_order, directed, n, k, longest = _LANDMARKS_HEADER.unpack_from(buf)
+        if magic != _LANDMARKS_MAGIC:
+            raise ValueError(f'{path} não é um índice de landmarks.')
+        if version not in (1, _LANDMARKS_VERSION):
+            raise ValueError(f'Versão de índice de landmarks {version} não suportada.')
+        if n != self.n:
+            raise ValueError(f'Índice construído para {n} vértices, mas o grafo tem {self.n}.')
+        typecode = typecode.decode()
+        view = memoryview(buf)
+        pos = _LANDMARKS_HEADER.size
+        sections = []
+        for code, length in [('i', k)] + [(typecode, n + 1)] * (k * (2 if directed else 1)):
+            size = array(code).itemsize * length
+            section = view[pos:pos + size].cast(code)
+            if byte_order != _BYTE_ORDER or not mmap:
+                section = array(code, section)
+                if byte_order != _BYTE_ORDER:
+                    section.byteswap()
+            sections.append(section)
+            pos += size + (-size % 8)
+        self._set_landmarks(sections[0], sections[1:k+1], sections[k+1:] if directed else None,
+                            longest, typecode)
+
+    def _astar(self, s, t):
+        # A* com limites inferiores pela desigualdade triangular: para cada
+        # landmark L, d(v, t) >= d(L, t) - d(L, v) e d(v, t) >= d(v, L) - d(t, L).
+        # Com pesos negativos o limite parte de p(t) - p(v), válido pelos
+        # potenciais de Johnson, em vez de 0.
+        _, forward, backward, slack, _ = self._landmarks
+        inf = float('inf')
+        to_target = [vector[t] for vector in forward]
+        from_target = [vector[t] for vector in backward]
+        potentials = self.johnson_reweight() if self._has_negative_weights() else None
+
+        def bound(i):
+            best = -inf
+            for fwd, bwd, lt, tl in zip(forward, backward, to_target, from_target):
+                lv, vl = fwd[i], bwd[i]
+                if lv != inf:
+                    if lt == inf:
+                        # L alcança v mas não t, então v não alcança t.
+                        return inf
+                    best = max(best, lt - lv)
+                if tl != inf:
+                    if vl == inf:
+                        return inf
+                    best = max(best, vl - tl)
+            base = 0.0 if potentials is None else potentials[t] - potentials[i]
+            return max(best - slack, base)
+
+        offsets, neighbors, weights = self._index_csr(False)
+        dist = array('d', [inf]) * (self.n+1)
+        parent = array('i', bytes(4 * (self.n+1)))
+        dist[s] = 0.0
+        heap = [(bound(s), 0.0, s)]
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if u == t:
+                return d, parent
+            for k in range(offsets[u], offsets[u+1]):
+                v = neighbors[k]
+                if d + weights[k] < dist[v]:
+                    h = bound(v)
+                    if h == inf:
+                        continue
+                    dist[v] = d + weights[k]
+                    parent[v] = u
+                    heapq.heappush(heap, (dist[v] + h, dist[v], v))
+        return inf, parent
+
+    def shortest_path(self, source, target, strategy=None):
+        """
+        Distância e caminho mínimo entre source e target. strategy escolhe a
+        busca: 'unidirectional' (BFS/Dijkstra a partir de source),
+        'bidirectional' (buscas simultâneas a partir das duas pontas) ou 'alt'
+        (A* com o índice de build_landmarks). Por padrão usa 'alt' quando o
+        índice existe e 'unidirectional' caso contrário.
+        Com o cache de árvores ativo, a árvore da origem é usada diretamente.
+        """
+        if strategy is None:
+            strategy = 'alt' if self._landmarks is not None else 'unidirectional'
+        if strategy not in ('unidirectional', 'bidirectional', 'alt'):
+            raise ValueError('Unsupported strategy')
+        if self._path_cache is not None:
+            return self._tree_path(self._cached_tree(source), target)
+        s, t = self.node_to_idx[source], self.node_to_idx[target]
+        if strategy == 'alt':
+            if self._landmarks is None:
+                raise ValueError('Índice de landmarks não construído.')
+            best, parent = self._astar(s, t)
+            if best == float('inf'):
+                return best, []
+            if self._is_unweighted():
+                best = int(best)
+            return round(best, 6), self._index_path(parent, t)
+        if strategy == 'bidirectional':
+            if self._is_unweighted():
+                best, meet, parent = self._bidirectional_bfs(s, t)
+            else:
+                best, meet, parent = self._bidirectional_dijkstra(s, t)
+            if not meet:
+                return float('inf'), []
+            path = self._index_path(parent[0], meet)
+            v = parent[1][meet]
+            while v:
+                path.append(self.idx_to_node[v])
+                v = parent[1][v]
+            return round(best, 6), path
+        dist, parent = self._sssp(s, (t,))
+        return self._tree_path((parent, dist), target)
+
+    def shortest_paths_batch(self, pairs):
+        """
+        Distância e caminho mínimo para cada par (source, target) de pairs,
+        no mesmo formato de shortest_path e na ordem da entrada. Os pares são
+        agrupados por origem: cada origem faz uma única busca, interrompida
+        assim que todos os seus destinos são fixados.
+        """
+        return list(self.iter_shortest_paths_batch(pairs))
+
+    def iter_shortest_paths_batch(self, pairs, window=65536):
+        """
+        Versão em fluxo de shortest_paths_batch: consome pairs em janelas de
+        até window pares, agrupa cada janela por origem e gera os resultados
+        na ordem da entrada, sem materializar o lote inteiro.
+        """
+        pairs = iter(pairs)
+        while True:
+            chunk = list(islice(pairs, window))
+            if not chunk:
+                return
+            yield from self._solve_batch(chunk)
+
+    def _solve_batch(self, pairs):
+        if self._path_cache is not None:
+            return [self._tree_path(self._cached_tree(s), t) for s, t in pairs]
+        targets = defaultdict(set)
+        for source, target in pairs:
+            targets[source].add(target)
+        # Com pesos negativos, várias origens compensam os potenciais de
+        # Johnson: cada busca vira um Dijkstra truncável em vez de um SPFA.
+        if len(targets) > 1 and self._has_negative_weights():
+            self.johnson_reweight()
+        idx = self.node_to_idx
+        answers = {}
+        for source, wanted in targets.items():
+            dist, parent = self._sssp(idx[source], [idx[t] for t in wanted])
+            for target in wanted:
+                answers[source, target] = self._tree_path((parent, dist), target)
+        return [answers[pair] for pair in pairs]
+
+    def multi_source_shortest_paths(self, sources, workers=None, chunksize=16):
+        """
+        Distâncias mínimas a partir de cada origem em sources, calculadas em um
+        pool de processos. Gera pares (origem, dist) na ordem de sources, com
+        dist um array('d') indexado por node_to_idx (inf para inalcançáveis).
+
+        Os processos leem o grafo sem cópia por tarefa: herdam-no via fork ou,
+        onde não há fork, abrem um snapshot temporário mapeado em memória.
+        Com pesos negativos os potenciais de Johnson são calculados uma vez antes.
+        """
+        global _shared_graph
+        sources = list(sources)
+        if self._has_negative_weights():
+            self.johnson_reweight()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(sources) <= 1:
+            for source in sources:
+                yield source, self._distance_vector(self.node_to_idx[source])
+            return
+        snapshot = None
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            initializer, initargs = None, ()
+            # O índice CSR (com os pesos mascarados, se houver arcos
+            # negativos) é montado antes do fork para que os processos o
+            # herdem em vez de cada um montar sua cópia.
+            self._index_csr(False)
+            _shared_graph = self
         else:
-            if self._has_negative_weights():
-                raise ValueError('Grafo possui pesos negativos, Dijkstra não pode ser usado.')
-            heap = [(0.0, source, None)]
-            dist = {source: 0.0}
-            parent = {source: None}
-            visited = set()
-            while heap:
-                d, u, p = heapq.heappop(heap)
-                if u in visited:
-                    continue
-                visited.add(u)
-                parent[u] = p
-                for v, w in self._neighbors_with_weights(u):
-                    if v not in dist or dist[v] > d + w:
-                        dist[v] = d + w
-                        heapq.heappush(heap, (dist[v], v, u))
-            paths = {}
-            for v in dist:
-                path = []
-                x = v
-                while x is not None:
-                    path.append(x)
-                    x = parent[x]
-                path.reverse()
-                paths[v] = (round(dist[v], 6), path)
-            return paths
\ No newline at end of file
+            context = multiprocessing.get_context()
+            fd, snapshot = tempfile.mkstemp(suffix='.graph')
+            os.close(fd)
+            self.save(snapshot)
+            initializer, initargs = _init_shared_graph, (snapshot, self.negative_edges, self._potentials)
+        try:
+            with context.Pool(workers, initializer, initargs) as pool:
+                yield from pool.imap(_shared_distances, sources, chunksize)
+        finally:
+            _shared_graph = None
+            if snapshot is not None:
+                os.remove(snapshot)
+
+    def shortest_path_tree(self, source):
+        """
+        Árvore de caminhos mínimos a partir de source como ShortestPathTree,
+        que guarda só os arrays de distâncias e predecessores.
+        """
+        if self._path_cache is not None:
+            parent, dist = self._cached_tree(source)
+        else:
+            dist, parent = self._sssp(self.node_to_idx[source])
+        return ShortestPathTree(source, dist, parent, self.node_to_idx, self.idx_to_node)
+
+    def all_shortest_paths(self, source, lazy=False):
+        """
+        Distância e caminho mínimo de source a cada vértice alcançável, como
+        dicionário. Com lazy=True devolve a ShortestPathTree, que monta cada
+        caminho só quando acessado em vez de todos de uma vez.
+        """
+        tree = self.shortest_path_tree(source)
+        return tree if lazy else tree.to_dict()
@@ -1,9 +1,133 @@
-from collections import deque
+import multiprocessing
+import os
+from array import array
+from collections import Counter, deque
+from itertools import accumulate
 from graph import BipartiteGraph
 
-class HopcroftKarp:
-    def __init__(self, graph: BipartiteGraph):
+
+def greedy_matching(graph: BipartiteGraph):
+    """Emparelhamento guloso: cada u de U, em ordem, fica com o primeiro vizinho livre."""
+    pairs = {}
+    taken = set()
+    for u in graph.get_U():
+        for v in graph.adj.get(u, ()):
+            if v not in taken:
+                pairs[u] = v
+                taken.add(v)
+                break
+    return pairs
+
+
+def min_degree_matching(graph: BipartiteGraph):
+    """
+    Guloso por grau mínimo: os vértices de U são tratados em ordem crescente
+    de grau e cada um fica com o vizinho livre de menor grau, deixando os
+    vértices mais disputados para quem tem mais opções.
+    """
+    adj = graph.adj
+    degree_V = Counter(v for u in graph.get_U() for v in adj.get(u, ()))
+    pairs = {}
+    taken = set()
+    for u in sorted(graph.get_U(), key=lambda u: len(adj.get(u, ()))):
+        free = [v for v in adj.get(u, ()) if v not in taken]
+        if free:
+            v = min(free, key=degree_V.__getitem__)
+            pairs[u] = v
+            taken.add(v)
+    return pairs
+
+
+def karp_sipser_matching(graph: BipartiteGraph):
+    """
+    Karp-Sipser: enquanto houver um vértice (de U ou de V) com um único
+    vizinho livre, emparelha os dois, o que nunca diminui o emparelhamento
+    máximo alcançável; quando não há, emparelha uma aresta qualquer e volta à
+    regra do grau 1.
+    """
+    U, V = graph.get_U(), graph.get_V()
+    # Vértices de U são 0..|U|-1 e os de V vêm em seguida.
+    index = {v: len(U) + j for j, v in enumerate(V)}
+    adj = [[] for _ in range(len(U) + len(V))]
+    for i, u in enumerate(U):
+        for v in graph.adj.get(u, ()):
+            j = index[v]
+            adj[i].append(j)
+            adj[j].append(i)
+    # degree conta os vizinhos ainda livres de cada vértice.
+    degree = array('i', map(len, adj))
+    mate = array('i', [-1]) * len(adj)
+    ones = deque(x for x in range(len(adj)) if degree[x] == 1)
+
+    def match(x, y):
+        mate[x], mate[y] = y, x
+        for z in (x, y):
+            for w in adj[z]:
+                if mate[w] == -1:
+                    degree[w] -= 1
+                    if degree[w] == 1:
+                        ones.append(w)
+
+    next_u = 0
+    while True:
+        while ones:
+            x = ones.popleft()
+            if mate[x] == -1 and degree[x] == 1:
+                match(x, next(w for w in adj[x] if mate[w] == -1))
+        while next_u < len(U) and (mate[next_u] != -1 or degree[next_u] == 0):
+            next_u += 1
+        if next_u == len(U):
+            break
+        match(next_u, next(w for w in adj[next_u] if mate[w] == -1))
+    return {U[i]: V[mate[i] - len(U)] for i in range(len(U)) if mate[i] != -1}
+
+
+INITIAL_MATCHINGS = {
+    'greedy': greedy_matching,
+    'min_degree': min_degree_matching,
+    'karp_sipser': karp_sipser_matching,
+}
+
+
+def initial_matching(graph: BipartiteGraph, init):
+    """
+    Emparelhamento inicial {u: v} para aquecer os algoritmos: init é None
+    (vazio), um nome de INITIAL_MATCHINGS ou uma função graph -> {u: v}.
+    """
+    if init is None:
+        return {}
+    if isinstance(init, str):
+        if init not in INITIAL_MATCHINGS:
+            raise ValueError(f"Inicialização desconhecida: {init}")
+        init = INITIAL_MATCHINGS[init]
+    return init(graph)
+
+
+class _WarmStart:
+    """
+    Partida a quente comum aos algoritmos de emparelhamento: warm_start aplica
+    o emparelhamento inicial de init por meio de _pair, que por padrão grava
+    os pares em pair_U e pair_V indexados pelos nomes.
+    """
+    def warm_start(self):
+        # Cada par inicial dispensa um caminho aumentante, contado em
+        # augmentations_saved.
+        pairs = initial_matching(self.graph, self.init)
+        for u, v in pairs.items():
+            self._pair(u, v)
+        self.augmentations_saved = len(pairs)
+        return len(pairs)
+
+    def _pair(self, u, v):
+        self.pair_U[u] = v
+        self.pair_V[v] = u
+
+
+class HopcroftKarp(_WarmStart):
+    def __init__(self, graph: BipartiteGraph, init=None):
         self.graph = graph
+        self.init = init
+        self.augmentations_saved = 0
         self.U = graph.get_U()
         self.V = graph.get_V()
         self.adj = graph.adj
@@ -42,7 +166,7 @@ class HopcroftKarp:
         return False
 
     def max_matching(self):
-        matching = 0
+        matching = self.warm_start()
         while self.bfs():
             for u in self.U:
                 if self.pair_U[u] is None and self.dfs(u):
@@ -50,9 +174,107 @@ class HopcroftKarp:
         return matching, self.pair_U
 
 
-class DFSMatching:
-    def __init__(self, graph: BipartiteGraph):
+class IndexedHopcroftKarp(_WarmStart):
+    """
+    Hopcroft-Karp sobre índices inteiros: a adjacência vira um CSR (offsets e
+    vizinhos em arrays) e pares e camadas ficam em arrays planos, com -1 para
+    vértices livres. A DFS usa pilha explícita e um cursor de arestas por
+    vértice, então nenhuma aresta é examinada duas vezes na mesma fase e
+    caminhos aumentantes longos não esbarram no limite de recursão.
+    """
+    def __init__(self, graph: BipartiteGraph, init=None):
+        self.graph = graph
+        self.init = init
+        self.augmentations_saved = 0
+        self.U = graph.get_U()
+        self.V = graph.get_V()
+        self.v_index = graph.V_index
+        self.offsets, self.neighbors = graph.csr()
+        self.pair_U = array('i', [-1]) * len(self.U)
+        self.pair_V = array('i', [-1]) * len(self.V)
+        # Camada de cada vértice de U na BFS; inf marca os fora das camadas.
+        self.inf = len(self.U) + 1
+        self.dist = array('i', [self.inf]) * len(self.U)
+
+    def bfs(self):
+        offsets, neighbors = self.offsets, self.neighbors
+        pair_U, pair_V, dist, inf = self.pair_U, self.pair_V, self.dist, self.inf
+        queue = array('i')
+        for u in range(len(pair_U)):
+            if pair_U[u] == -1:
+                dist[u] = 0
+                queue.append(u)
+            else:
+                dist[u] = inf
+        # As camadas param na primeira que alcança um vértice livre de V:
+        # só caminhos aumentantes mínimos interessam à fase.
+        limit = inf
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            if dist[u] > limit:
+                break
+            for k in range(offsets[u], offsets[u+1]):
+                match_u = pair_V[neighbors[k]]
+                if match_u == -1:
+                    limit = dist[u]
+                elif dist[match_u] == inf:
+                    dist[match_u] = dist[u] + 1
+                    queue.append(match_u)
+        return limit != inf
+
+    def dfs(self, root, cursor):
+        # Procura um caminho aumentante a partir de root pelas camadas da BFS.
+        # A pilha guarda o caminho atual; a aresta escolhida por cada vértice
+        # é a anterior ao seu cursor, o que permite aplicar o caminho no fim.
+        offsets, neighbors = self.offsets, self.neighbors
+        pair_U, pair_V, dist, inf = self.pair_U, self.pair_V, self.dist, self.inf
+        stack = [root]
+        while stack:
+            u = stack[-1]
+            k = cursor[u]
+            if k == offsets[u+1]:
+                dist[u] = inf
+                stack.pop()
+                continue
+            cursor[u] = k + 1
+            match_u = pair_V[neighbors[k]]
+            if match_u == -1:
+                for x in stack:
+                    v = neighbors[cursor[x] - 1]
+                    pair_U[x] = v
+                    pair_V[v] = x
+                return True
+            if dist[match_u] == dist[u] + 1:
+                stack.append(match_u)
+        return False
+
+    def _pair(self, u, v):
+        # pair_U e pair_V são indexados pelos identificadores inteiros.
+        i, j = self.graph.U_index[u], self.v_index[v]
+        self.pair_U[i] = j
+        self.pair_V[j] = i
+
+    def max_matching(self):
+        matching = self.warm_start()
+        while self.bfs():
+            cursor = array('i', self.offsets)
+            for u in range(len(self.pair_U)):
+                if self.pair_U[u] == -1 and self.dfs(u, cursor):
+                    matching += 1
+        return matching, self.named_pairs()
+
+    def named_pairs(self):
+        # pair_U no formato das outras classes: {u: v ou None}.
+        return {u: self.V[j] if j != -1 else None for u, j in zip(self.U, self.pair_U)}
+
+
+class DFSMatching(_WarmStart):
+    def __init__(self, graph: BipartiteGraph, init=None):
         self.graph = graph
+        self.init = init
+        self.augmentations_saved = 0
         self.U = graph.get_U()
         self.V = graph.get_V()
         self.adj = graph.adj
@@ -70,7 +292,7 @@ class DFSMatching:
         return False
 
     def max_matching(self):
-        matching = 0
+        matching = self.warm_start()
         for u in self.U:
             if self.pair_U[u] is None:
                 visited = set()
@@ -79,9 +301,11 @@ class DFSMatching:
         return matching, self.pair_U
 
 
-class BFSMatching:
-    def __init__(self, graph: BipartiteGraph):
+class BFSMatching(_WarmStart):
+    def __init__(self, graph: BipartiteGraph, init=None):
         self.graph = graph
+        self.init = init
+        self.augmentations_saved = 0
         self.U = graph.get_U()
         self.V = graph.get_V()
         self.adj = graph.adj
@@ -135,7 +359,7 @@ class BFSMatching:
         return list(reversed(path))
 
     def max_matching(self):
-        matching = 0
+        matching = self.warm_start()
         
         while True:
             path = self.find_augmenting_path()
@@ -149,3 +373,542 @@ class BFSMatching:
             matching += 1
             
         return matching, self.pair_U
+
+
+class DynamicMatching:
+    """
+    Emparelhamento máximo mantido sob atualizações do grafo. O emparelhamento
+    inicial vem do IndexedHopcroftKarp; depois, cada inserção ou remoção feita
+    por esta classe repara pair_U/pair_V com buscas de caminho aumentante que
+    partem só dos vértices afetados, em vez de recalcular tudo.
+
+    Como o emparelhamento é máximo antes de cada atualização, qualquer caminho
+    aumentante novo precisa terminar num vértice recém-liberado ou passar pela
+    aresta inserida, e basta procurar a partir deles.
+    """
+    def __init__(self, graph: BipartiteGraph, init=None):
+        self.graph = graph
+        self.matching, self.pair_U = IndexedHopcroftKarp(graph, init=init).max_matching()
+        self.pair_V = {v: None for v in graph.get_V()}
+        for u, v in self.pair_U.items():
+            if v is not None:
+                self.pair_V[v] = u
+
+    def max_matching(self):
+        return self.matching, self.pair_U
+
+    def find_from_U(self, root, blocked=()):
+        # Busca em largura alternada a partir de root em U até um vértice
+        # livre de V; retorna (fim, parent) ou None.
+        adj, pair_V = self.graph.adj, self.pair_V
+        parent = {}
+        seen = {root}
+        queue = deque([root])
+        while queue:
+            x = queue.popleft()
+            for y in adj[x]:
+                if y not in parent and y not in blocked:
+                    parent[y] = x
+                    match = pair_V[y]
+                    if match is None:
+                        return y, parent
+                    if match not in seen:
+                        seen.add(match)
+                        queue.append(match)
+        return None
+
+    def find_from_V(self, root, blocked=()):
+        # Mesma busca, partindo de root em V e seguindo a adjacência reversa
+        # até um vértice livre de U.
+        radj, pair_U = self.graph.radj, self.pair_U
+        parent = {}
+        seen = {root}
+        queue = deque([root])
+        while queue:
+            y = queue.popleft()
+            for x in radj[y]:
+                if x not in parent and x not in blocked:
+                    parent[x] = y
+                    match = pair_U[x]
+                    if match is None:
+                        return x, parent
+                    if match not in seen:
+                        seen.add(match)
+                        queue.append(match)
+        return None
+
+    def apply_from_U(self, root, found):
+        # Inverte o caminho de root até o vértice livre de V encontrado.
+        y, parent = found
+        while True:
+            x = parent[y]
+            previous = self.pair_U[x]
+            self.pair_U[x] = y
+            self.pair_V[y] = x
+            if x == root:
+                return
+            y = previous
+
+    def apply_from_V(self, root, found):
+        x, parent = found
+        while True:
+            y = parent[x]
+            previous = self.pair_V[y]
+            self.pair_V[y] = x
+            self.pair_U[x] = y
+            if y == root:
+                return
+            x = previous
+
+    def augment_from_U(self, u):
+        found = self.find_from_U(u)
+        if found is None:
+            return False
+        self.apply_from_U(u, found)
+        self.matching += 1
+        return True
+
+    def augment_from_V(self, v):
+        found = self.find_from_V(v)
+        if found is None:
+            return False
+        self.apply_from_V(v, found)
+        self.matching += 1
+        return True
+
+    def add_vertex_U(self, u):
+        self.graph.add_vertex_U(u)
+        self.pair_U[u] = None
+
+    def add_vertex_V(self, v):
+        self.graph.add_vertex_V(v)
+        self.pair_V[v] = None
+
+    def add_edge(self, u, v):
+        self.graph.add_edge(u, v)
+        a, b = self.pair_U[u], self.pair_V[v]
+        if a is None and b is None:
+            self.pair_U[u] = v
+            self.pair_V[v] = u
+            self.matching += 1
+            return
+        # O caminho aumentante, se existir, usa a aresta nova: é
+        # x0 ... a - u - v - b ... y, onde cada metade some se o respectivo
+        # extremo está livre. As metades são procuradas separadamente e,
+        # sendo o emparelhamento máximo antes da inserção, não se cruzam.
+        back = ahead = None
+        if a is not None:
+            back = self.find_from_V(a, blocked=(u,))
+            if back is None:
+                return
+        if b is not None:
+            ahead = self.find_from_U(b, blocked=(v,))
+            if ahead is None:
+                return
+        if back is not None:
+            self.apply_from_V(a, back)
+        if ahead is not None:
+            self.apply_from_U(b, ahead)
+        self.pair_U[u] = v
+        self.pair_V[v] = u
+        self.matching += 1
+
+    def remove_edge(self, u, v):
+        self.graph.remove_edge(u, v)
+        if self.pair_U[u] != v or v in self.graph.adj[u]:
+            return
+        self.pair_U[u] = None
+        self.pair_V[v] = None
+        self.matching -= 1
+        if not self.augment_from_U(u):
+            self.augment_from_V(v)
+
+    def remove_vertex_U(self, u):
+        self.graph.remove_vertex_U(u)
+        v = self.pair_U.pop(u)
+        if v is not None:
+            self.pair_V[v] = None
+            self.matching -= 1
+            self.augment_from_V(v)
+
+    def remove_vertex_V(self, v):
+        self.graph.remove_vertex_V(v)
+        u = self.pair_V.pop(v)
+        if u is not None:
+            self.pair_U[u] = None
+            self.matching -= 1
+            self.augment_from_U(u)
+
+
+def _reverse_csr(offsets, neighbors, n_V):
+    # CSR reverso (v -> vértices de U) por ordenação por contagem; o terceiro
+    # array dá a posição de cada aresta no CSR original (para achar o peso).
+    degree = array('i', bytes(4 * n_V))
+    for v in neighbors:
+        degree[v] += 1
+    r_offsets = array('i', accumulate(degree, initial=0))
+    position = array('i', r_offsets[:-1])
+    r_neighbors = array('i', bytes(4 * len(neighbors)))
+    r_edges = array('i', bytes(4 * len(neighbors)))
+    for u in range(len(offsets) - 1):
+        for k in range(offsets[u], offsets[u+1]):
+            v = neighbors[k]
+            r_neighbors[position[v]] = u
+            r_edges[position[v]] = k
+            position[v] += 1
+    return r_offsets, r_neighbors, r_edges
+
+
+def bipartite_components(graph: BipartiteGraph):
+    """
+    Componentes conexas do grafo bipartido em tempo linear, sobre o CSR de
+    graph. Retorna (quantidade, comp_U, comp_V): o rótulo de cada vértice de U
+    e de V por identificador inteiro, com -1 para vértices isolados de V.
+    """
+    offsets, neighbors = graph.csr()
+    n_U, n_V = len(graph.get_U()), len(graph.get_V())
+    r_offsets, r_neighbors, _ = _reverse_csr(offsets, neighbors, n_V)
+    comp_U = array('i', [-1]) * n_U
+    comp_V = array('i', [-1]) * n_V
+    count = 0
+    for root in range(n_U):
+        if comp_U[root] != -1:
+            continue
+        comp_U[root] = count
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in neighbors[offsets[u]:offsets[u+1]]:
+                if comp_V[v] == -1:
+                    comp_V[v] = count
+                    for x in r_neighbors[r_offsets[v]:r_offsets[v+1]]:
+                        if comp_U[x] == -1:
+                            comp_U[x] = count
+                            stack.append(x)
+        count += 1
+    return count, comp_U, comp_V
+
+
+def _match_batch(batch, init=None):
+    # Resolve um lote de componentes; cada uma chega como (ids de U, ids de V,
+    # arestas em ids locais) e volta como os pares casados em ids globais.
+    matched = []
+    for U_ids, V_ids, u_array, v_array in batch:
+        component = BipartiteGraph.from_edges(u_array, v_array, list(U_ids), list(V_ids))
+        _, pairs = IndexedHopcroftKarp(component, init=init).max_matching()
+        matched.append([(u, v) for u, v in pairs.items() if v is not None])
+    return matched
+
+
+class ComponentMatching:
+    """
+    Emparelhamento máximo resolvido por componente conexa: o grafo é dividido
+    em tempo linear, as componentes grandes vão cada uma para um processo do
+    pool e as pequenas são agrupadas em lotes de pelo menos batch_edges
+    arestas, para o custo de despacho não dominar. Os resultados voltam no
+    formato (count, pair_U) dos outros algoritmos.
+    """
+    def __init__(self, graph: BipartiteGraph, workers=None, batch_edges=4096, init=None):
+        self.graph = graph
+        self.init = init
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.batch_edges = batch_edges
+        self.U = graph.get_U()
+        self.V = graph.get_V()
+        self.pair_U = {u: None for u in self.U}
+        self.components = 0
+
+    def batches(self):
+        # Lotes de componentes em ids locais, das maiores para as menores.
+        offsets, neighbors = self.graph.csr()
+        self.components, comp_U, comp_V = bipartite_components(self.graph)
+        members_U = [array('i') for _ in range(self.components)]
+        members_V = [array('i') for _ in range(self.components)]
+        for u, c in enumerate(comp_U):
+            members_U[c].append(u)
+        # Posição de cada vértice de V dentro da sua componente.
+        local_V = array('i', bytes(4 * len(comp_V)))
+        for v, c in enumerate(comp_V):
+            if c != -1:
+                local_V[v] = len(members_V[c])
+                members_V[c].append(v)
+        sizes = [sum(offsets[u+1] - offsets[u] for u in U_ids) for U_ids in members_U]
+        batch, batch_size = [], 0
+        for c in sorted(range(self.components), key=sizes.__getitem__, reverse=True):
+            if sizes[c] == 0:
+                break
+            u_array, v_array = array('i'), array('i')
+            for i, u in enumerate(members_U[c]):
+                row = neighbors[offsets[u]:offsets[u+1]]
+                u_array.extend([i] * len(row))
+                v_array.extend([local_V[v] for v in row])
+            batch.append((members_U[c], members_V[c], u_array, v_array))
+            batch_size += sizes[c]
+            if batch_size >= self.batch_edges:
+                yield batch
+                batch, batch_size = [], 0
+        if batch:
+            yield batch
+
+    def max_matching(self):
+        batches = list(self.batches())
+        if self.workers <= 1 or len(batches) <= 1:
+            results = [_match_batch(batch, self.init) for batch in batches]
+        else:
+            with multiprocessing.get_context().Pool(min(self.workers, len(batches))) as pool:
+                results = pool.starmap(_match_batch, [(batch, self.init) for batch in batches])
+        matching = 0
+        U, V = self.U, self.V
+        for matched in results:
+            for pairs in matched:
+                for u, v in pairs:
+                    self.pair_U[U[u]] = V[v]
+                matching += len(pairs)
+        return matching, self.pair_U
+
+
+class AuctionMatching:
+    """
+    Atribuição de peso máximo pelo leilão de Bertsekas com escalonamento de
+    epsilon, sobre as arestas existentes (CSR e pesos de graph) em vez de uma
+    matriz densa. Todo vértice de U é atribuído a um vértice distinto de V e a
+    soma dos pesos fica a menos de tolerance do máximo: o epsilon final é
+    tolerance/(|U|+1). Com pesos inteiros e o padrão tolerance=1.0 o
+    resultado é ótimo; com pesos fracionários, uma tolerância menor que a
+    menor diferença entre somas possíveis (por exemplo, 0.01 para pesos com
+    duas casas decimais) também dá o ótimo, ao custo de mais rodadas.
+
+    Se não houver atribuição que cubra U, o leilão não termina; por isso,
+    com check_feasibility, um Hopcroft-Karp confirma antes que ela existe.
+    """
+    def __init__(self, graph: BipartiteGraph, check_feasibility=True, scaling=5, tolerance=1.0):
+        if tolerance <= 0:
+            raise ValueError("tolerance deve ser positiva.")
+        self.graph = graph
+        self.check_feasibility = check_feasibility
+        self.scaling = scaling
+        self.tolerance = tolerance
+        self.U = graph.get_U()
+        self.V = graph.get_V()
+        self.offsets, self.neighbors = graph.csr()
+        self.weights = graph.csr_weights()
+        self.prices = array('d', bytes(8 * len(self.V)))
+        # Aresta (posição no CSR) atribuída a cada u e dono de cada v.
+        self.assigned = array('i', [-1]) * len(self.U)
+        self.owner = array('i', [-1]) * len(self.V)
+        self.total_weight = 0.0
+
+    def forward(self, eps, span):
+        # Uma rodada do leilão: cada u livre dá um lance no v de maior valor
+        # (peso - preço), subindo o preço pela diferença para o segundo
+        # melhor mais eps; quem perde o v volta para a fila.
+        offsets, neighbors, weights = self.offsets, self.neighbors, self.weights
+        prices, assigned, owner = self.prices, self.assigned, self.owner
+        queue = deque(range(len(assigned)))
+        while queue:
+            u = queue.popleft()
+            best = second = float('-inf')
+            best_k = -1
+            for k in range(offsets[u], offsets[u+1]):
+                value = weights[k] - prices[neighbors[k]]
+                if value > best:
+                    second = best
+                    best, best_k = value, k
+                elif value > second:
+                    second = value
+            if best_k == -1:
+                raise ValueError(f"Vértice {self.U[u]} não tem arestas.")
+            if second == float('-inf'):
+                # Sem segunda opção o lance é livre; um salto finito basta.
+                second = best - span
+            v = neighbors[best_k]
+            prices[v] += best - second + eps
+            previous = owner[v]
+            if previous != -1:
+                assigned[previous] = -1
+                queue.append(previous)
+            owner[v] = u
+            assigned[u] = best_k
+
+    def reverse(self, eps):
+        # Leilão reverso de Bertsekas-Castañon para o caso |U| < |V|: vértices
+        # de V livres com preço acima do menor preço atribuído (lam) disputam
+        # os vértices de U até que nenhum livre fique acima de lam, o que
+        # garante a otimalidade da atribuição.
+        offsets, neighbors, weights = self.offsets, self.neighbors, self.weights
+        prices, assigned, owner = self.prices, self.assigned, self.owner
+        if not len(assigned):
+            return
+        r_offsets, r_neighbors, r_edges = _reverse_csr(offsets, neighbors, len(prices))
+        lam = min(prices[neighbors[k]] for k in assigned)
+        profit = array('d', [weights[k] - prices[neighbors[k]] for k in assigned])
+        queue = deque(v for v in range(len(prices)) if owner[v] == -1 and prices[v] > lam)
+        while queue:
+            v = queue.popleft()
+            best = second = float('-inf')
+            best_t = -1
+            for t in range(r_offsets[v], r_offsets[v+1]):
+                value = weights[r_edges[t]] - profit[r_neighbors[t]]
+                if value > best:
+                    second = best
+                    best, best_t = value, t
+                elif value > second:
+                    second = value
+            if best <= lam + eps:
+                prices[v] = lam
+                continue
+            prices[v] = max(lam, second - eps)
+            u, k = r_neighbors[best_t], r_edges[best_t]
+            previous = neighbors[assigned[u]]
+            owner[previous] = -1
+            owner[v] = u
+            assigned[u] = k
+            profit[u] = weights[k] - prices[v]
+            if prices[previous] > lam:
+                queue.append(previous)
+
+    def max_matching(self):
+        if self.check_feasibility:
+            count, _ = IndexedHopcroftKarp(self.graph).max_matching()
+            if count < len(self.U):
+                raise ValueError(f"Não há atribuição que cubra U: no máximo {count} de {len(self.U)} vértices.")
+        weights = self.weights
+        span = (max(weights) - min(weights) if weights else 0.0) + 1.0
+        # Cada um dos |U| vértices fica a menos de eps do ótimo, então com eps
+        # final menor que tolerance/|U| a soma fica a menos de tolerance.
+        final = self.tolerance / (len(self.U) + 1)
+        eps = max(span / 2, final)
+        while True:
+            self.assigned[:] = array('i', [-1]) * len(self.U)
+            self.owner[:] = array('i', [-1]) * len(self.V)
+            self.forward(eps, span)
+            if eps <= final:
+                break
+            eps = max(eps / self.scaling, final)
+        self.reverse(eps)
+        self.total_weight = sum(weights[k] for k in self.assigned)
+        pair_U = {u: self.V[self.neighbors[k]] for u, k in zip(self.U, self.assigned)}
+        return len(pair_U), pair_U
+
+
+class CapacitatedHopcroftKarp:
+    """
+    Hopcroft-Karp para b-emparelhamento: cada vértice aceita até sua
+    capacidade (graph.capacities()) em arestas do emparelhamento, sem clonar
+    vértices por vaga. As vagas ficam implícitas numa carga por vértice e o
+    emparelhamento é uma marca por aresta do CSR; um vértice cheio de V só é
+    atravessado por uma de suas arestas emparelhadas, como no grafo expandido.
+    Memória e tempo ficam proporcionais ao grafo original.
+    """
+    def __init__(self, graph: BipartiteGraph):
+        self.graph = graph
+        self.U = graph.get_U()
+        self.V = graph.get_V()
+        self.offsets, self.neighbors = graph.csr()
+        self.r_offsets, self.r_neighbors, self.r_edges = _reverse_csr(self.offsets, self.neighbors, len(self.V))
+        self.cap_U, self.cap_V = graph.capacities()
+        self.load_U = array('i', bytes(4 * len(self.U)))
+        self.load_V = array('i', bytes(4 * len(self.V)))
+        self.matched = bytearray(len(self.neighbors))
+        # Camadas da BFS para os dois lados; inf marca os fora das camadas.
+        self.inf = len(self.U) + 1
+        self.dist_U = array('i', [self.inf]) * len(self.U)
+        self.dist_V = array('i', [self.inf]) * len(self.V)
+
+    def bfs(self):
+        offsets, neighbors, matched = self.offsets, self.neighbors, self.matched
+        r_offsets, r_neighbors, r_edges = self.r_offsets, self.r_neighbors, self.r_edges
+        dist_U, dist_V, inf = self.dist_U, self.dist_V, self.inf
+        cap_V, load_V = self.cap_V, self.load_V
+        queue = array('i')
+        for u in range(len(dist_U)):
+            if self.load_U[u] < self.cap_U[u]:
+                dist_U[u] = 0
+                queue.append(u)
+            else:
+                dist_U[u] = inf
+        for v in range(len(dist_V)):
+            dist_V[v] = inf
+        limit = inf
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            if dist_U[u] > limit:
+                break
+            for k in range(offsets[u], offsets[u+1]):
+                v = neighbors[k]
+                if matched[k] or dist_V[v] != inf:
+                    continue
+                dist_V[v] = dist_U[u]
+                if load_V[v] < cap_V[v]:
+                    limit = dist_U[u]
+                    continue
+                # v está cheio: segue por suas arestas emparelhadas.
+                for t in range(r_offsets[v], r_offsets[v+1]):
+                    match_u = r_neighbors[t]
+                    if matched[r_edges[t]] and dist_U[match_u] == inf:
+                        dist_U[match_u] = dist_U[u] + 1
+                        queue.append(match_u)
+        return limit != inf
+
+    def dfs(self, root, cursor_U, cursor_V):
+        # Como em IndexedHopcroftKarp, mas a pilha alterna vértices de U
+        # (índices 0..|U|-1) e de V (deslocados de |U|); o cursor de cada um
+        # aponta logo depois da aresta que ele usa no caminho atual.
+        offsets, neighbors, matched = self.offsets, self.neighbors, self.matched
+        r_offsets, r_neighbors, r_edges = self.r_offsets, self.r_neighbors, self.r_edges
+        dist_U, dist_V, inf = self.dist_U, self.dist_V, self.inf
+        cap_V, load_V = self.cap_V, self.load_V
+        n_U = len(dist_U)
+        stack = [root]
+        while stack:
+            x = stack[-1]
+            if x < n_U:
+                k = cursor_U[x]
+                if k == offsets[x+1]:
+                    dist_U[x] = inf
+                    stack.pop()
+                    continue
+                cursor_U[x] = k + 1
+                v = neighbors[k]
+                if matched[k] or dist_V[v] != dist_U[x]:
+                    continue
+                if load_V[v] < cap_V[v]:
+                    for y in stack:
+                        if y < n_U:
+                            matched[cursor_U[y] - 1] = 1
+                        else:
+                            matched[r_edges[cursor_V[y - n_U] - 1]] = 0
+                    self.load_U[root] += 1
+                    load_V[v] += 1
+                    return True
+                stack.append(n_U + v)
+            else:
+                v = x - n_U
+                t = cursor_V[v]
+                if t == r_offsets[v+1]:
+                    dist_V[v] = inf
+                    stack.pop()
+                    continue
+                cursor_V[v] = t + 1
+                match_u = r_neighbors[t]
+                if matched[r_edges[t]] and dist_U[match_u] == dist_V[v] + 1:
+                    stack.append(match_u)
+        return False
+
+    def max_matching(self):
+        matching = 0
+        while self.bfs():
+            cursor_U = array('i', self.offsets)
+            cursor_V = array('i', self.r_offsets)
+            for u in range(len(self.U)):
+                while self.load_U[u] < self.cap_U[u] and self.dfs(u, cursor_U, cursor_V):
+                    matching += 1
+        return matching, self.assignment()
+
+    def assignment(self):
+        # Para cada u, a lista dos vértices de V emparelhados com ele.
+        offsets, neighbors, matched, V = self.offsets, self.neighbors, self.matched, self.V
+        return {u: [V[neighbors[k]] for k in range(offsets[i], offsets[i+1]) if matched[k]]
+                for i, u in enumerate(self.U)}
@@ -4,25 +4,12 @@ import matplotlib.pyplot as plt
 import numpy as np
 from collections import defaultdict
 from graph import BipartiteGraph
-from algorithms import HopcroftKarp, DFSMatching, BFSMatching
+from generators import bipartite_graph
+from algorithms import HopcroftKarp, IndexedHopcroftKarp, DFSMatching, BFSMatching, DynamicMatching, AuctionMatching, INITIAL_MATCHINGS
 
 def generate_graph(U_size, V_size, min_edges=3, max_edges=10, seed=None):
     """Gera um grafo bipartido com tamanho e densidade especificados"""
-    if seed is not None:
-        random.seed(seed)
-    
-    doctors = [f'D{i}' for i in range(U_size)]
-    hospitals = [f'H{i}' for i in range(V_size)]
-    
-    graph = BipartiteGraph(doctors, hospitals)
-    
-    for doctor in doctors:
-        k = random.randint(min_edges, max_edges)
-        preferred = random.sample(hospitals, min(k, len(hospitals)))
-        for hospital in preferred:
-            graph.add_edge(doctor, hospital)
-    
-    return graph
+    return bipartite_graph(U_size, V_size, min_degree=min_edges, max_degree=max_edges, seed=seed)
 
 def run_single_test(graph):
     """Executa todos os algoritmos em um grafo e retorna os tempos e resultados"""
@@ -31,23 +18,30 @@ def run_single_test(graph):
     
     # Hopcroft-Karp
     hk = HopcroftKarp(graph)
-    start = time.time()
+    start = time.perf_counter()
     hk_count, _ = hk.max_matching()
-    times['Hopcroft-Karp'] = time.time() - start
+    times['Hopcroft-Karp'] = time.perf_counter() - start
     results['Hopcroft-Karp'] = hk_count
     
+    # Hopcroft-Karp sobre índices inteiros
+    ihk = IndexedHopcroftKarp(graph)
+    start = time.perf_counter()
+    ihk_count, _ = ihk.max_matching()
+    times['HK (índices)'] = time.perf_counter() - start
+    results['HK (índices)'] = ihk_count
+    
     # DFS clássico
     dfs = DFSMatching(graph)
-    start = time.time()
+    start = time.perf_counter()
     dfs_count, _ = dfs.max_matching()
-    times['DFS'] = time.time() - start
+    times['DFS'] = time.perf_counter() - start
     results['DFS'] = dfs_count
     
     # BFS clássico
     bfs = BFSMatching(graph)
-    start = time.time()
+    start = time.perf_counter()
     bfs_count, _ = bfs.max_matching()
-    times['BFS'] = time.time() - start
+    times['BFS'] = time.perf_counter() - start
     results['BFS'] = bfs_count
     
     return results, times
@@ -99,12 +93,106 @@ def benchmark_multiple_runs(graph_size=1000, num_runs=20):
     
     return run_results
 
+def benchmark_warm_start(graph_size=1000, num_runs=5):
+    """Compara cada algoritmo sem e com emparelhamento inicial (warm start)"""
+    print(f"Comparando inicializações com grafo {graph_size}x{graph_size}...")
+    
+    matchers = {
+        'Hopcroft-Karp': HopcroftKarp,
+        'HK (índices)': IndexedHopcroftKarp,
+        'DFS': DFSMatching,
+        'BFS': BFSMatching,
+    }
+    inits = [None] + list(INITIAL_MATCHINGS)
+    warm_results = defaultdict(list)
+    
+    for run in range(num_runs):
+        graph = generate_graph(graph_size, graph_size, seed=run * 42)
+        counts = set()
+        for alg, matcher_class in matchers.items():
+            for init in inits:
+                # O tempo inclui a heurística inicial, para a comparação ser justa
+                matcher = matcher_class(graph, init=init)
+                start = time.perf_counter()
+                count, _ = matcher.max_matching()
+                elapsed = time.perf_counter() - start
+                counts.add(count)
+                warm_results[(alg, init or 'sem')].append((elapsed, matcher.augmentations_saved))
+        
+        if len(counts) > 1:
+            print(f"  AVISO: Resultados diferentes na rodada {run}: {counts}")
+    
+    print(f"{'Algoritmo':<15} {'Inicialização':<13} {'Tempo médio':>12} {'Aumentos poupados':>18}")
+    for (alg, init), values in warm_results.items():
+        avg_time = np.mean([t for t, _ in values])
+        avg_saved = np.mean([saved for _, saved in values])
+        print(f"{alg:<15} {init:<13} {avg_time:>11.4f}s {avg_saved:>18.1f}")
+    
+    return warm_results
+
+def benchmark_updates(graph_size=1000, num_updates=200, seed=0):
+    """Compara o reparo incremental do DynamicMatching com recalcular tudo a cada atualização"""
+    print(f"Aplicando {num_updates} atualizações num grafo {graph_size}x{graph_size}...")
+    
+    graph = generate_graph(graph_size, graph_size, seed=seed)
+    dynamic = DynamicMatching(graph)
+    rng = random.Random(seed)
+    repair_time = recompute_time = 0.0
+    
+    for step in range(num_updates):
+        # Alterna remoção de uma preferência e inclusão de outra
+        doctor = rng.choice(graph.get_U())
+        start = time.perf_counter()
+        if step % 2 == 0 and graph.adj[doctor]:
+            dynamic.remove_edge(doctor, rng.choice(graph.adj[doctor]))
+        else:
+            dynamic.add_edge(doctor, rng.choice(graph.get_V()))
+        repair_time += time.perf_counter() - start
+        
+        start = time.perf_counter()
+        count, _ = IndexedHopcroftKarp(graph).max_matching()
+        recompute_time += time.perf_counter() - start
+        
+        if count != dynamic.matching:
+            print(f"  AVISO: Resultados diferentes na atualização {step}: {dynamic.matching} vs {count}")
+    
+    print(f"  Reparo incremental: {repair_time / num_updates * 1000:.3f} ms por atualização")
+    print(f"  Recálculo completo: {recompute_time / num_updates * 1000:.3f} ms por atualização")
+    
+    return repair_time, recompute_time
+
+def benchmark_auction(sizes=[1000, 10000, 100000], seed=0):
+    """Mede o leilão com escalonamento de epsilon em instâncias esparsas pesadas"""
+    print("Executando benchmark do leilão (atribuição de peso máximo)...")
+    
+    auction_results = {}
+    
+    for size in sizes:
+        # O dobro de hospitais torna viável a atribuição completa exigida pelo leilão.
+        graph = bipartite_graph(size, 2 * size, min_degree=5, max_degree=5, seed=seed + size, weights=(1, 100))
+        
+        # Pré-verificação de viabilidade (Hopcroft-Karp), medida à parte
+        start = time.perf_counter()
+        count, _ = IndexedHopcroftKarp(graph).max_matching()
+        check_time = time.perf_counter() - start
+        
+        auction = AuctionMatching(graph, check_feasibility=False)
+        start = time.perf_counter()
+        auction.max_matching()
+        auction_time = time.perf_counter() - start
+        
+        auction_results[size] = (check_time, auction_time, auction.total_weight)
+        print(f"  {size}x{size}: verificação {check_time:.3f}s, leilão {auction_time:.3f}s, "
+              f"peso total {auction.total_weight:.0f} ({count} emparelháveis)")
+    
+    return auction_results
+
 def plot_size_comparison(size_results):
     """Gera gráfico comparando algoritmos por tamanho"""
     plt.figure(figsize=(12, 8))
     
-    algorithms = ['Hopcroft-Karp', 'DFS', 'BFS']
-    colors = ['blue', 'red', 'green']
+    algorithms = ['Hopcroft-Karp', 'HK (índices)', 'DFS', 'BFS']
+    colors = ['blue', 'purple', 'red', 'green']
     
     for i, alg in enumerate(algorithms):
         if alg in size_results:
@@ -139,8 +227,8 @@ def plot_run_variation(run_results):
     
     # Subplot 1: Tempos por execução
     plt.subplot(2, 2, 1)
-    algorithms = ['Hopcroft-Karp', 'DFS', 'BFS']
-    colors = ['blue', 'red', 'green']
+    algorithms = ['Hopcroft-Karp', 'HK (índices)', 'DFS', 'BFS']
+    colors = ['blue', 'purple', 'red', 'green']
     
     for i, alg in enumerate(algorithms):
         if alg in run_results:
@@ -227,6 +315,24 @@ def main():
     run_results = benchmark_multiple_runs(graph_size=1000, num_runs=15)
     plot_run_variation(run_results)
     
+    print("\n" + "="*60 + "\n")
+    
+    # Benchmark 3: Emparelhamento inicial (warm start)
+    print("3. Comparando inicializações...")
+    benchmark_warm_start(graph_size=1000, num_runs=5)
+    
+    print("\n" + "="*60 + "\n")
+    
+    # Benchmark 4: Atualizações incrementais
+    print("4. Comparando reparo incremental e recálculo...")
+    benchmark_updates(graph_size=1000, num_updates=200)
+    
+    print("\n" + "="*60 + "\n")
+    
+    # Benchmark 5: Atribuição pesada (leilão)
+    print("5. Executando leilão em instâncias pesadas...")
+    benchmark_auction(sizes=[1000, 10000, 100000])
+    
     print("\n=== Análise Finalizada ===")
     print("Gráficos salvos:")
     print("- benchmark_por_tamanho.png")
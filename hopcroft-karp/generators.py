@@ -0,0 +1,110 @@
+"""
+Geradores vetorizados (NumPy) de grafos bipartidos médicos x hospitais,
+reprodutíveis pela semente, para testes e benchmarks em larga escala.
+
+Os graus dos médicos seguem uma distribuição uniforme ou uma lei de
+potência; no segundo caso a procura pelos hospitais também é desigual
+(poucos hospitais muito disputados). O resultado vai direto para o CSR de
+um BipartiteGraph (bipartite_graph) ou é gravado num arquivo de arestas
+"D<i> H<j> [peso]" lido por BipartiteGraph.from_edge_file (write_bipartite).
+"""
+import numpy as np
+
+from graph import BipartiteGraph
+
+# Arestas por bloco gravado em arquivo.
+_BLOCK = 1 << 20
+# Rodadas de novo sorteio para hospitais repetidos na lista de um médico;
+# o que sobrar depois delas é descartado.
+_REDRAW_ROUNDS = 32
+
+
+def bipartite_csr(n_U, n_V, degrees='uniform', min_degree=3, max_degree=10, exponent=2.5,
+                  seed=None, weights=None):
+    """
+    Sorteia as arestas e devolve o CSR (offsets, neighbors, pesos) em arrays
+    do NumPy, com as linhas dos médicos 0..n_U-1 e os vizinhos ordenados.
+
+    degrees='uniform': grau de cada médico uniforme em [min_degree,
+    max_degree] e hospitais uniformes. degrees='power_law': grau com
+    P(k) ∝ k^-exponent no mesmo intervalo e hospitais escolhidos com
+    probabilidade em lei de Zipf, o que dá graus em lei de potência também
+    do lado de V. weights=(lo, hi) sorteia pesos inteiros em [lo, hi];
+    None deixa o grafo sem pesos.
+    """
+    if n_V < 1 and n_U:
+        raise ValueError("bipartite_csr precisa de pelo menos um hospital.")
+    rng = np.random.default_rng(seed)
+    max_degree = min(max_degree, n_V)
+    min_degree = min(min_degree, max_degree)
+    if degrees == 'uniform':
+        degree = rng.integers(min_degree, max_degree + 1, n_U)
+
+        def draw(size):
+            return rng.integers(0, n_V, size)
+    elif degrees == 'power_law':
+        if exponent <= 1:
+            raise ValueError("exponent deve ser maior que 1.")
+        ks = np.arange(max(min_degree, 1), max_degree + 1)
+        p = ks.astype(np.float64) ** -exponent
+        degree = rng.choice(ks, n_U, p=p / p.sum())
+        # Popularidade de Zipf sobre uma ordem aleatória dos hospitais.
+        cumulative = np.cumsum(np.arange(1, n_V + 1, dtype=np.float64) ** (-1 / (exponent - 1)))
+        cumulative /= cumulative[-1]
+        rank = rng.permutation(n_V)
+
+        def draw(size):
+            return rank[np.minimum(np.searchsorted(cumulative, rng.random(size)), n_V - 1)]
+    else:
+        raise ValueError(f"Distribuição de graus desconhecida: {degrees}")
+
+    u = np.repeat(np.arange(n_U, dtype=np.int64), degree)
+    v = draw(len(u))
+    for attempt in range(_REDRAW_ROUNDS + 1):
+        key = u * n_V + v
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        first = np.ones(len(key), bool)
+        first[1:] = key[1:] != key[:-1]
+        if first.all() or attempt == _REDRAW_ROUNDS:
+            break
+        v[order[~first]] = draw(len(key) - np.count_nonzero(first))
+    key = key[first]
+    u, v = key // n_V, key % n_V
+    offsets = np.zeros(n_U + 1, np.int32)
+    np.cumsum(np.bincount(u, minlength=n_U), out=offsets[1:])
+    w = None
+    if weights is not None:
+        lo, hi = weights
+        w = rng.integers(lo, hi + 1, len(v)).astype(np.float64)
+    return offsets, v.astype(np.int32), w
+
+
+def bipartite_graph(n_U, n_V, degrees='uniform', min_degree=3, max_degree=10, exponent=2.5,
+                    seed=None, weights=None):
+    """
+    Grafo bipartido com médicos D0..D{n_U-1} e hospitais H0..H{n_V-1},
+    montado direto no CSR (parâmetros como em bipartite_csr).
+    """
+    offsets, neighbors, w = bipartite_csr(n_U, n_V, degrees, min_degree, max_degree, exponent, seed, weights)
+    return BipartiteGraph.from_csr(offsets, neighbors, [f'D{i}' for i in range(n_U)],
+                                   [f'H{j}' for j in range(n_V)], w)
+
+
+def write_bipartite(path, n_U, n_V, degrees='uniform', min_degree=3, max_degree=10, exponent=2.5,
+                    seed=None, weights=None):
+    """
+    Grava o mesmo grafo de bipartite_graph (mesma semente, mesmas arestas)
+    como arquivo de arestas, em blocos, sem montar o BipartiteGraph.
+    """
+    offsets, neighbors, w = bipartite_csr(n_U, n_V, degrees, min_degree, max_degree, exponent, seed, weights)
+    u = np.repeat(np.arange(n_U), np.diff(offsets))
+    with open(path, 'w') as f:
+        for start in range(0, len(neighbors), _BLOCK):
+            block = slice(start, start + _BLOCK)
+            columns = [u[block].tolist(), neighbors[block].tolist()]
+            if w is None:
+                f.write(''.join(map('D{} H{}\n'.format, *columns)))
+            else:
+                f.write(''.join(map('D{} H{} {:g}\n'.format, *columns, w[block].tolist())))
+    return path
@@ -1,5 +1,7 @@
+from array import array
 from collections import defaultdict
-from typing import List, Dict, Set
+from itertools import accumulate
+from typing import List, Dict, Set, Tuple
 
 class BipartiteGraph:
     def __init__(self, U: List[str], V: List[str]):
@@ -10,17 +12,347 @@ class BipartiteGraph:
         """
         self.U: List[str] = U
         self.V: List[str] = V
-        self.adj: Dict[str, List[str]] = defaultdict(list)
+        # Identificador inteiro de cada vértice (sua posição em U ou V), para
+        # validar pertinência em O(1) e indexar os arrays dos algoritmos.
+        self.U_index: Dict[str, int] = {u: i for i, u in enumerate(U)}
+        self.V_index: Dict[str, int] = {v: j for j, v in enumerate(V)}
+        self._adj = defaultdict(list)
+        # Adjacência reversa (v -> vértices de U), usada nas buscas que
+        # partem de um vértice de V; só é montada quando alguém a pede.
+        self._radj = None
+        # Peso de cada aresta (u, v); arestas sem peso explícito valem 1.0.
+        self._weights: Dict[Tuple[str, str], float] = {}
+        # CSR (offsets, vizinhos) sobre os identificadores inteiros, e os pesos
+        # alinhados com os vizinhos.
+        self._csr = None
+        self._csr_weights = None
+        # Capacidade de cada vértice (quantas arestas do emparelhamento ele
+        # aceita); vértices fora destes dicionários têm capacidade 1.
+        self.capacity_U: Dict[str, int] = {}
+        self.capacity_V: Dict[str, int] = {}
 
-    def add_edge(self, u: str, v: str):
+    @classmethod
+    def from_edges(cls, u_array, v_array, U: List[str] = None, V: List[str] = None, w_array=None):
         """
-        Adiciona uma aresta entre um vértice u de U e um vértice v de V.
+        Constrói o grafo de uma vez a partir de dois arrays de identificadores
+        inteiros (aresta k liga u_array[k] a v_array[k], com peso w_array[k]
+        se dado), direto numa adjacência CSR compacta. U e V dão os nomes dos
+        vértices; se omitidos, os próprios identificadores 0..n-1 servem de nome.
         """
-        if u not in self.U:
+        if len(u_array) != len(v_array):
+            raise ValueError("u_array e v_array devem ter o mesmo tamanho.")
+        if w_array is not None and len(w_array) != len(u_array):
+            raise ValueError("w_array deve ter o mesmo tamanho de u_array.")
+        if U is None:
+            U = list(range(max(u_array, default=-1) + 1))
+        if V is None:
+            V = list(range(max(v_array, default=-1) + 1))
+        if len(u_array) and not (0 <= min(u_array) and max(u_array) < len(U)):
+            raise ValueError("Identificador fora do conjunto U.")
+        if len(v_array) and not (0 <= min(v_array) and max(v_array) < len(V)):
+            raise ValueError("Identificador fora do conjunto V.")
+        graph = cls(U, V)
+        # Ordenação por contagem: grau de cada u, offsets acumulados e cada
+        # aresta gravada na próxima posição livre da linha do seu u.
+        degree = array('i', bytes(4 * len(U)))
+        for u in u_array:
+            degree[u] += 1
+        offsets = array('i', accumulate(degree, initial=0))
+        position = array('i', offsets[:-1])
+        neighbors = array('i', bytes(4 * len(v_array)))
+        for u, v in zip(u_array, v_array):
+            neighbors[position[u]] = v
+            position[u] += 1
+        if w_array is not None:
+            position = array('i', offsets[:-1])
+            weights = array('d', bytes(8 * len(w_array)))
+            for u, w in zip(u_array, w_array):
+                weights[position[u]] = w
+                position[u] += 1
+            graph._weights = None
+            graph._csr_weights = weights
+        graph._adj = None
+        graph._csr = (offsets, neighbors)
+        return graph
+
+    @classmethod
+    def from_csr(cls, offsets, neighbors, U: List[str], V: List[str], weights=None):
+        """
+        Monta o grafo a partir de uma adjacência CSR pronta, no layout de
+        csr() e csr_weights(): a linha de U[i] ocupa neighbors[offsets[i]:
+        offsets[i + 1]]. Os arrays podem ser quaisquer objetos com protocolo
+        de buffer contíguo em int32 (e float64 para os pesos), como arrays do
+        NumPy, e são copiados para array.
+        """
+        sections = []
+        for typecode, section in (('i', offsets), ('i', neighbors), ('d', weights)):
+            if section is None:
+                sections.append(None)
+                continue
+            copy, view = array(typecode), memoryview(section)
+            if view.itemsize != copy.itemsize:
+                raise ValueError("Tipo de elemento incompatível com o layout CSR.")
+            copy.frombytes(view.cast('B'))
+            sections.append(copy)
+        offsets, neighbors, weights = sections
+        if len(offsets) != len(U) + 1 or offsets[0] != 0 or offsets[-1] != len(neighbors):
+            raise ValueError("offsets inconsistente com U e neighbors.")
+        if weights is not None and len(weights) != len(neighbors):
+            raise ValueError("weights deve ter o mesmo tamanho de neighbors.")
+        if len(neighbors) and not (0 <= min(neighbors) and max(neighbors) < len(V)):
+            raise ValueError("Identificador fora do conjunto V.")
+        graph = cls(U, V)
+        if weights is not None:
+            graph._weights = None
+            graph._csr_weights = weights
+        graph._adj = None
+        graph._csr = (offsets, neighbors)
+        return graph
+
+    @classmethod
+    def from_edge_file(cls, path: str):
+        """
+        Lê um arquivo com uma aresta "u v" ou "u v peso" por linha (linhas
+        vazias ou iniciadas por # são ignoradas). Cada linha é conferida: num
+        arquivo com pesos, as arestas sem peso valem 1.0, e linhas com outro
+        número de colunas são rejeitadas. Os nomes ganham identificadores na
+        ordem em que aparecem e o grafo é montado por from_edges.
+        """
+        with open(path) as f:
+            data = f.read()
+        lines = data.splitlines()
+        if '#' in data:
+            # Comentários viram linhas vazias, preservando a numeração.
+            lines = ['' if line.lstrip().startswith('#') else line for line in lines]
+            data = '\n'.join(lines)
+        widths = set(map(len, map(str.split, lines)))
+        widths.discard(0)
+        if not widths <= {2, 3}:
+            number = next(k for k, line in enumerate(lines, 1) if len(line.split()) not in (0, 2, 3))
+            raise ValueError(f"Linha {number} de {path}: esperava 'u v' ou 'u v peso'.")
+        U_index: Dict[str, int] = {}
+        V_index: Dict[str, int] = {}
+        w_array = None
+        if widths != {2, 3}:
+            # Todas as linhas com o mesmo número de colunas: as colunas saem
+            # do fatiamento da lista de tokens.
+            columns = max(widths, default=2)
+            tokens = data.split()
+            us, vs = tokens[0::columns], tokens[1::columns]
+            if columns == 3:
+                w_array = array('d', map(float, tokens[2::3]))
+        else:
+            # Arquivo com pesos em que algumas arestas não têm peso (1.0).
+            rows = [row for row in map(str.split, lines) if row]
+            us, vs = [row[0] for row in rows], [row[1] for row in rows]
+            w_array = array('d', [float(row[2]) if len(row) == 3 else 1.0 for row in rows])
+        # setdefault avalia len() antes de inserir, então cada nome novo
+        # recebe o próximo identificador livre.
+        u_array = array('i', [U_index.setdefault(u, len(U_index)) for u in us])
+        v_array = array('i', [V_index.setdefault(v, len(V_index)) for v in vs])
+        return cls.from_edges(u_array, v_array, list(U_index), list(V_index), w_array)
+
+    @property
+    def adj(self) -> Dict[str, List[str]]:
+        # Grafos vindos de from_edges só têm o CSR; a adjacência por nomes é
+        # montada na primeira vez que é pedida.
+        if self._adj is None:
+            offsets, neighbors = self._csr
+            V = self.V
+            self._adj = defaultdict(list)
+            for i, u in enumerate(self.U):
+                self._adj[u] = [V[j] for j in neighbors[offsets[i]:offsets[i+1]]]
+        return self._adj
+
+    @property
+    def radj(self) -> Dict[str, List[str]]:
+        if self._radj is None:
+            self._radj = defaultdict(list)
+            for u, vs in self.adj.items():
+                for v in vs:
+                    self._radj[v].append(u)
+        return self._radj
+
+    @property
+    def weights(self) -> Dict[Tuple[str, str], float]:
+        # Como adj: grafos pesados vindos de from_edges montam o dicionário
+        # de pesos a partir do CSR só quando ele é pedido.
+        if self._weights is None:
+            offsets, neighbors = self._csr
+            U, V, weights = self.U, self.V, self._csr_weights
+            self._weights = {}
+            for i, u in enumerate(U):
+                for k in range(offsets[i], offsets[i+1]):
+                    self._weights[u, V[neighbors[k]]] = weights[k]
+        return self._weights
+
+    def weight(self, u: str, v: str) -> float:
+        """
+        Retorna o peso da aresta (u, v); arestas sem peso explícito valem 1.0.
+        """
+        return self.weights.get((u, v), 1.0)
+
+    def csr(self):
+        """
+        Retorna a adjacência como CSR (offsets, vizinhos) sobre os
+        identificadores inteiros: os vizinhos de U[i] são
+        V[vizinhos[k]] para k em offsets[i]..offsets[i+1]-1.
+        """
+        if self._csr is None:
+            V_index = self.V_index
+            adj = self._adj
+            offsets = array('i', [0])
+            neighbors = array('i')
+            for u in self.U:
+                neighbors.extend([V_index[v] for v in adj.get(u, ())])
+                offsets.append(len(neighbors))
+            self._csr = (offsets, neighbors)
+        return self._csr
+
+    def csr_weights(self):
+        """
+        Retorna os pesos como array('d') alinhado com os vizinhos de csr().
+        """
+        if self._csr_weights is None:
+            offsets, neighbors = self.csr()
+            U, V, weights = self.U, self.V, self.weights
+            self._csr_weights = array('d', [1.0]) * len(neighbors)
+            if weights:
+                for i, u in enumerate(U):
+                    for k in range(offsets[i], offsets[i+1]):
+                        self._csr_weights[k] = weights.get((u, V[neighbors[k]]), 1.0)
+        return self._csr_weights
+
+    def _changed(self):
+        # Toda mutação passa pela adjacência e pelos pesos por nomes; o CSR
+        # fica obsoleto.
+        adj = self.adj
+        self.weights  # materializa os pesos enquanto o CSR existe
+        self._csr = None
+        self._csr_weights = None
+        return adj
+
+    def add_edge(self, u: str, v: str, weight: float = None):
+        """
+        Adiciona uma aresta entre um vértice u de U e um vértice v de V,
+        opcionalmente com peso (o padrão é 1.0).
+        """
+        if u not in self.U_index:
+            raise ValueError(f"Vértice {u} não está no conjunto U.")
+        if v not in self.V_index:
+            raise ValueError(f"Vértice {v} não está no conjunto V.")
+        self._changed()[u].append(v)
+        if weight is not None:
+            self._weights[u, v] = weight
+        if self._radj is not None:
+            self._radj[v].append(u)
+
+    def remove_edge(self, u: str, v: str):
+        """
+        Remove uma aresta entre u e v (uma só, se houver arestas repetidas).
+        """
+        if v not in self.adj.get(u, ()):
+            raise ValueError(f"Aresta ({u}, {v}) não existe.")
+        adj = self._changed()
+        adj[u].remove(v)
+        if v not in adj[u]:
+            self._weights.pop((u, v), None)
+        if self._radj is not None:
+            self._radj[v].remove(u)
+
+    def add_vertex_U(self, u: str):
+        """
+        Adiciona um vértice isolado ao conjunto U.
+        """
+        if u in self.U_index:
+            raise ValueError(f"Vértice {u} já está no conjunto U.")
+        self._changed()
+        self.U_index[u] = len(self.U)
+        self.U.append(u)
+
+    def add_vertex_V(self, v: str):
+        """
+        Adiciona um vértice isolado ao conjunto V.
+        """
+        if v in self.V_index:
+            raise ValueError(f"Vértice {v} já está no conjunto V.")
+        self._changed()
+        self.V_index[v] = len(self.V)
+        self.V.append(v)
+
+    def set_capacity_U(self, u: str, capacity: int):
+        """
+        Define quantos vértices de V podem ser emparelhados com u.
+        """
+        if u not in self.U_index:
             raise ValueError(f"Vértice {u} não está no conjunto U.")
-        if v not in self.V:
+        if capacity < 0:
+            raise ValueError(f"Capacidade de {u} não pode ser negativa.")
+        self.capacity_U[u] = capacity
+
+    def set_capacity_V(self, v: str, capacity: int):
+        """
+        Define quantos vértices de U podem ser emparelhados com v (ex: vagas
+        de um hospital).
+        """
+        if v not in self.V_index:
             raise ValueError(f"Vértice {v} não está no conjunto V.")
-        self.adj[u].append(v)
+        if capacity < 0:
+            raise ValueError(f"Capacidade de {v} não pode ser negativa.")
+        self.capacity_V[v] = capacity
+
+    def capacities(self):
+        """
+        Retorna as capacidades como dois array('i') indexados pelos
+        identificadores inteiros de U e de V.
+        """
+        cap_U = array('i', [self.capacity_U.get(u, 1) for u in self.U])
+        cap_V = array('i', [self.capacity_V.get(v, 1) for v in self.V])
+        return cap_U, cap_V
+
+    @staticmethod
+    def _swap_remove(names: List[str], index: Dict[str, int], x: str):
+        # Remove x em O(1) pondo o último vértice no seu lugar; só o
+        # identificador desse último muda.
+        i = index.pop(x)
+        last = names.pop()
+        if last != x:
+            names[i] = last
+            index[last] = i
+
+    def remove_vertex_U(self, u: str) -> List[str]:
+        """
+        Remove u de U junto com suas arestas e retorna os vizinhos que ele tinha.
+        O último vértice de U passa a ocupar a posição (e o identificador) de u.
+        """
+        if u not in self.U_index:
+            raise ValueError(f"Vértice {u} não está no conjunto U.")
+        # As estruturas por nomes são montadas antes de mexer em U, enquanto
+        # os identificadores do CSR ainda valem.
+        radj = self.radj
+        neighbors = self._changed().pop(u, [])
+        self._swap_remove(self.U, self.U_index, u)
+        self.capacity_U.pop(u, None)
+        for v in neighbors:
+            radj[v].remove(u)
+            self._weights.pop((u, v), None)
+        return neighbors
+
+    def remove_vertex_V(self, v: str) -> List[str]:
+        """
+        Remove v de V junto com suas arestas e retorna os vizinhos que ele tinha.
+        O último vértice de V passa a ocupar a posição (e o identificador) de v.
+        """
+        if v not in self.V_index:
+            raise ValueError(f"Vértice {v} não está no conjunto V.")
+        adj = self._changed()
+        neighbors = self.radj.pop(v, [])
+        self._swap_remove(self.V, self.V_index, v)
+        self.capacity_V.pop(v, None)
+        for u in neighbors:
+            adj[u].remove(v)
+            self._weights.pop((u, v), None)
+        return neighbors
 
     def neighbors(self, u: str) -> List[str]:
         """
@@ -28,6 +360,12 @@ class BipartiteGraph:
         """
         return self.adj[u]
 
+    def neighbors_V(self, v: str) -> List[str]:
+        """
+        Retorna a lista de vizinhos (vértices de U) conectados a v (vértice de V).
+        """
+        return self.radj[v]
+
     def get_U(self) -> List[str]:
         return self.U
 
@@ -1,7 +1,7 @@
 import time
 import random
 from graph import BipartiteGraph
-from algorithms import HopcroftKarp, DFSMatching, BFSMatching
+from algorithms import HopcroftKarp, IndexedHopcroftKarp, ComponentMatching, DFSMatching, BFSMatching
 
 def print_results(name, matching_count, duration):
     print(f"{name:<20} | Emparelhamentos: {matching_count:<5} | Tempo: {duration:.4f} s")
@@ -28,25 +28,41 @@ def run_benchmark(U_size=1000, V_size=1000, min_edges=3, max_edges=10):
 
     # Hopcroft-Karp
     hk = HopcroftKarp(graph)
-    start = time.time()
+    start = time.perf_counter()
     hk_count, _ = hk.max_matching()
-    duration = time.time() - start
+    duration = time.perf_counter() - start
     results['Hopcroft-Karp'] = hk_count
     print_results("Hopcroft-Karp", hk_count, duration)
 
+    # Hopcroft-Karp sobre índices inteiros
+    ihk = IndexedHopcroftKarp(graph)
+    start = time.perf_counter()
+    ihk_count, _ = ihk.max_matching()
+    duration = time.perf_counter() - start
+    results['Hopcroft-Karp (índices)'] = ihk_count
+    print_results("HK (índices)", ihk_count, duration)
+
+    # Hopcroft-Karp por componente conexa, em paralelo
+    cm = ComponentMatching(graph)
+    start = time.perf_counter()
+    cm_count, _ = cm.max_matching()
+    duration = time.perf_counter() - start
+    results['Hopcroft-Karp (componentes)'] = cm_count
+    print_results("HK (componentes)", cm_count, duration)
+
     # DFS clássico
     dfs = DFSMatching(graph)
-    start = time.time()
+    start = time.perf_counter()
     dfs_count, _ = dfs.max_matching()
-    duration = time.time() - start
+    duration = time.perf_counter() - start
     results['DFS'] = dfs_count
     print_results("DFS clássico", dfs_count, duration)
 
     # BFS clássico
     bfs = BFSMatching(graph)
-    start = time.time()
+    start = time.perf_counter()
     bfs_count, _ = bfs.max_matching()
-    duration = time.time() - start
+    duration = time.perf_counter() - start
     results['BFS'] = bfs_count
     print_results("BFS clássico", bfs_count, duration)
 
@@ -0,0 +1,47 @@
+"""
+Testes da suíte de benchmarks (benchmark.py).
+
+    python -m pytest -q tests
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import benchmark  # noqa: E402
+
+
+def test_caso_que_falha_nao_interrompe_a_execucao(tmp_path):
+    out = tmp_path / 'resultados.json'
+    argv = ['run', '--graph', os.path.join(ROOT, 'data.txt'), '--representations', 'csr',
+            '--matching-size', '20', '--repeat', '1', '--warmup', '0', '--out', str(out)]
+    assert benchmark.main(argv) == 0
+    results = json.loads(out.read_text())['results']
+    assert 'ciclo de peso negativo' in results['shortest_path[csr]']['error']
+    assert 'median' in results['bfs[csr]'] and 'median' in results['matching[Hopcroft-Karp]']
+    baseline = {'results': dict(results, **{'shortest_path[csr]': results['bfs[csr]']})}
+    assert benchmark.compare(baseline, {'results': results}) == ['shortest_path[csr]']
+    assert benchmark.compare({'results': results}, {'results': results}) == []
+
+
+def test_check_load_aponta_carregamento_mais_lento_que_a_referencia():
+    results = {
+        'load[referência]': {'median': 1.0},
+        'load[csr]': {'median': 0.8},
+        'load[adj_list]': {'median': 1.3},
+        'load[bitset]': {'error': 'ValueError: x'},
+        'bfs[csr]': {'median': 5.0},
+    }
+    assert benchmark.load_regressions(results, threshold=0.1) == ['load[adj_list]']
+    assert benchmark.load_regressions(results, threshold=0.5) == []
+    assert benchmark.load_regressions({'load[csr]': {'median': 1.0}}) == []
+
+
+def test_carregador_de_referencia_le_o_mesmo_grafo():
+    path = os.path.join(ROOT, 'data.txt')
+    reference = benchmark.reference_load(path)
+    graph = benchmark.Graph(representation='adj_list', data_path=path)
+    assert sorted(reference) == sorted(graph.adj_list)
+    for name, neighbors in reference.items():
+        assert sorted(neighbors) == sorted(graph.adj_list[name])
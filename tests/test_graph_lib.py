@@ -0,0 +1,201 @@
+"""
+Testes de regressão do graph_lib.
+
+    python -m pytest -q tests
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from graph_lib import Graph  # noqa: E402
+
+
+def load(tmp_path, text, representation='csr'):
+    path = tmp_path / 'grafo.txt'
+    path.write_text(text)
+    return Graph(representation=representation, data_path=str(path))
+
+
+def bellman_ford(names, arcs, sources):
+    # Referência: arestas negativas valem só no sentido listado, as demais nos
+    # dois; None se houver ciclo negativo alcançável de sources.
+    dist = dict.fromkeys(names, float('inf'))
+    dist.update(dict.fromkeys(sources, 0.0))
+    for _ in range(len(names)):
+        changed = False
+        for u, v, w in arcs:
+            if dist[u] + w < dist[v]:
+                dist[v], changed = dist[u] + w, True
+        if not changed:
+            return dist
+    return None
+
+
+def random_negative_graph(rng, n):
+    names = [f'v{i}' for i in range(n)]
+    lines, arcs = [], []
+    for _ in range(rng.randint(n, 3 * n)):
+        u, v = rng.sample(names, 2)
+        w = float(rng.choice((-2, -1, -1, 1, 2, 3, 4, 5)))
+        lines.append(f'{u} {v} {w:g}')
+        arcs.append((u, v, w))
+        if w >= 0:
+            arcs.append((v, u, w))
+    return f'{n}\n' + '\n'.join(lines) + '\n', arcs
+
+
+def edges(graph):
+    return sorted((min(u, v), max(u, v), w) for u in graph.adj_list for v, w in graph.adj_list[u])[::2]
+
+
+def test_colunas_misturadas_seguem_cada_linha(tmp_path):
+    graph = load(tmp_path, '5\n1 2\n3 4 5 6\n', 'adj_list')
+    assert edges(graph) == [('1', '2', 1.0), ('3', '4', 5.0)]
+
+
+def test_colunas_extras_sao_ignoradas(tmp_path):
+    graph = load(tmp_path, '5\na b\nc d 2 x', 'adj_list')
+    assert edges(graph) == [('a', 'b', 1.0), ('c', 'd', 2.0)]
+
+
+def test_linhas_vazias_no_caminho_rapido(tmp_path):
+    graph = load(tmp_path, '4\na b 2\n\nc d 3\n', 'adj_list')
+    assert edges(graph) == [('a', 'b', 2.0), ('c', 'd', 3.0)]
+
+
+def test_snapshot_e_landmarks_sem_mmap_fecham_o_arquivo(tmp_path, recwarn):
+    graph = load(tmp_path, '4\na b 2\nb c 3\nc d 1\n')
+    graph.save(str(tmp_path / 'grafo.bin'))
+    graph.build_landmarks(k=2)
+    graph.save_landmarks(str(tmp_path / 'alt.bin'))
+    copy = Graph.load(str(tmp_path / 'grafo.bin'), mmap=False)
+    copy.load_landmarks(str(tmp_path / 'alt.bin'), mmap=False)
+    assert copy.shortest_path('a', 'd') == graph.shortest_path('a', 'd')
+    assert not [w for w in recwarn if issubclass(w.category, ResourceWarning)]
+
+
+def test_distancia_menos_um_nao_e_inalcancavel(tmp_path):
+    graph = load(tmp_path, '3\na b -1\nb c 3\n')
+    assert graph.shortest_path('a', 'b') == (-1.0, ['a', 'b'])
+    assert graph.shortest_path('a', 'b', strategy='bidirectional') == (-1.0, ['a', 'b'])
+    assert graph.all_shortest_paths('a') == {'a': (0.0, ['a']), 'b': (-1.0, ['a', 'b']),
+                                             'c': (2.0, ['a', 'b', 'c'])}
+    assert graph.shortest_paths_batch([('a', 'b'), ('b', 'c')]) == [(-1.0, ['a', 'b']), (3.0, ['b', 'c'])]
+
+
+def test_caminhos_com_pesos_negativos_conferem_com_bellman_ford(tmp_path):
+    rng = random.Random(2024)
+    checked = 0
+    while checked < 60:
+        text, arcs = random_negative_graph(rng, rng.randint(3, 9))
+        graph = load(tmp_path, text)
+        names = list(graph.node_to_idx)
+        source = rng.choice(names)
+        if bellman_ford(names, arcs, names) is None:
+            # Os potenciais de Johnson recusam ciclos negativos em qualquer
+            # parte do grafo.
+            with pytest.raises(ValueError):
+                graph.johnson_reweight()
+            continue
+        expected = bellman_ford(names, arcs, [source])
+        checked += 1
+        tree = graph.all_shortest_paths(source)
+        assert {v: d for v, (d, _) in tree.items()} == {v: d for v, d in expected.items() if d != float('inf')}
+        batch = graph.shortest_paths_batch([(source, v) for v in names])
+        for v, (d, path) in zip(names, batch):
+            assert d == expected[v]
+            assert path == tree[v][1] if v in tree else path == []
+            assert graph.shortest_path(source, v, strategy='bidirectional')[0] == d
+        graph.enable_path_cache()
+        cached = graph.shortest_paths_batch([(source, v) for v in names])
+        assert [d for d, _ in cached] == [d for d, _ in batch]
+
+
+def test_ciclo_de_peso_zero_com_pesos_decimais_nao_e_negativo(tmp_path):
+    graph = load(tmp_path, '3\n8 3 -0.8\n3 7 -1.6\n7 8 2.4\n')
+    assert graph.shortest_path('8', '7') == (-2.4, ['8', '3', '7'])
+    assert graph.all_shortest_paths('7')['3'] == (1.6, ['7', '8', '3'])
+    graph.johnson_reweight()
+    assert graph.shortest_paths_batch([('8', '7'), ('7', '3')]) == [(-2.4, ['8', '3', '7']), (1.6, ['7', '8', '3'])]
+
+
+def test_ciclo_negativo_continua_detectado(tmp_path):
+    graph = load(tmp_path, '3\na b -1\nb c -1\nc a 1.5\n')
+    with pytest.raises(ValueError):
+        graph.all_shortest_paths('a')
+
+
+NEGATIVE = '5\na b 2\nb c -1\nc d 4\nd e 1\na e 7\n'
+
+
+def test_multi_source_compartilha_o_indice_montado_antes_do_pool(tmp_path):
+    for text in ('5\na b 2\nb c 1\nc d 4\nd e 1\na e 7\n', NEGATIVE):
+        graph = load(tmp_path, text, 'adj_list')
+        sources = list(graph.node_to_idx)
+        parallel = dict(graph.multi_source_shortest_paths(sources, workers=2))
+        assert 'base' in graph._index_cache
+        serial = dict(graph.multi_source_shortest_paths(sources, workers=1))
+        assert parallel == serial
+
+
+def test_processos_sem_fork_recebem_os_potenciais(tmp_path, monkeypatch):
+    import graph_lib
+    graph = load(tmp_path, NEGATIVE)
+    potentials = graph.johnson_reweight()
+    graph.save(str(tmp_path / 'grafo.bin'))
+
+    def no_spfa(*args, **kwargs):
+        raise AssertionError('potenciais recalculados no processo filho')
+    monkeypatch.setattr(Graph, '_spfa', no_spfa)
+    graph_lib._init_shared_graph(str(tmp_path / 'grafo.bin'), graph.negative_edges, potentials)
+    try:
+        source = graph_lib._shared_graph.node_to_idx['a']
+        assert list(graph_lib._shared_graph._distance_vector(source)) == list(graph._distance_vector(source))
+    finally:
+        graph_lib._shared_graph = None
+
+
+def test_bitset_percorre_sem_montar_o_csr(tmp_path):
+    text = '7\n1 2\n1 3\n2 4\n3 4\n4 5\n6 7\n5 5\n'
+    bitset, matrix = load(tmp_path, text, 'bitset'), load(tmp_path, text, 'adj_matrix')
+    for method in ('bfs', 'dfs'):
+        assert getattr(bitset, method)('1') == getattr(matrix, method)('1')
+        bitset.write_search_tree('1', method, str(tmp_path / 'a.txt'))
+        matrix.write_search_tree('1', method, str(tmp_path / 'b.txt'))
+        assert (tmp_path / 'a.txt').read_text() == (tmp_path / 'b.txt').read_text()
+    assert bitset.all_shortest_paths('1') == matrix.all_shortest_paths('1')
+    assert list(bitset.component_labels().labels) == list(matrix.component_labels().labels)
+    assert bitset.connected('1', '5') and not bitset.connected('1', '6')
+    assert not bitset._index_cache
+
+
+@pytest.mark.parametrize('name, args', [
+    ('grid', dict(rows=30, cols=30, seed=2, drop=0.3)),
+    ('erdos_renyi', dict(n=500, m=300, seed=4)),
+    ('barabasi_albert', dict(n=300, m=2, seed=5)),
+])
+def test_gerador_em_memoria_igual_ao_arquivo(tmp_path, name, args):
+    generate = getattr(pytest.importorskip('graph_generators'), name)
+    memory = generate(**args)
+    disk = Graph(representation='csr', data_path=generate(path=str(tmp_path / 'g.txt'), **args))
+    assert memory.n == disk.n
+    assert memory.idx_to_node == disk.idx_to_node
+    assert list(memory.csr_offsets) == list(disk.csr_offsets)
+    assert list(memory.csr_neighbors) == list(disk.csr_neighbors)
+    assert list(memory.csr_weights) == list(disk.csr_weights)
+
+
+def test_to_numpy_nao_altera_as_distancias_da_arvore(tmp_path):
+    np = pytest.importorskip('numpy')
+    graph = load(tmp_path, '3\na b 2\nb c 3\n')
+    tree = graph.shortest_path_tree('a')
+    vector = tree.to_numpy()
+    assert vector.tolist()[1:] == [0.0, 2.0, 5.0]
+    with pytest.raises(ValueError):
+        vector[2] = 99.0
+    assert graph.shortest_path_tree('a').dist[2] == 2.0
+    unweighted = load(tmp_path, '3\na b\nb c\n').shortest_path_tree('a')
+    assert np.array_equal(unweighted.to_numpy()[1:], [0.0, 1.0, 2.0])
@@ -0,0 +1,226 @@
+"""
+Testes de regressão dos algoritmos de emparelhamento (hopcroft-karp/).
+
+    python -m pytest -q tests
+"""
+import os
+import random
+import sys
+from array import array
+from itertools import permutations
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hopcroft-karp'))
+from algorithms import (  # noqa: E402
+    AuctionMatching, BFSMatching, CapacitatedHopcroftKarp, ComponentMatching, DynamicMatching, DFSMatching, HopcroftKarp, INITIAL_MATCHINGS, IndexedHopcroftKarp, initial_matching,
+)
+from generators import bipartite_graph, write_bipartite  # noqa: E402
+from graph import BipartiteGraph  # noqa: E402
+
+
+@pytest.mark.parametrize('matcher', [HopcroftKarp, IndexedHopcroftKarp, DFSMatching, BFSMatching])
+@pytest.mark.parametrize('init', [None, *INITIAL_MATCHINGS])
+def test_partida_a_quente_preserva_o_maximo(matcher, init):
+    graph = bipartite_graph(60, 50, min_degree=1, max_degree=4, seed=3)
+    expected = HopcroftKarp(graph).max_matching()[0]
+    algorithm = matcher(graph, init=init)
+    size, pairs = algorithm.max_matching()
+    assert size == expected
+    assert algorithm.augmentations_saved == (len(initial_matching(graph, init)) if init else 0)
+    matched = {u: v for u, v in pairs.items() if v is not None}
+    assert len(matched) == size and len(set(matched.values())) == size
+    assert all(v in graph.neighbors(u) for u, v in matched.items())
+
+
+def test_arquivo_de_arestas_confere_as_colunas_de_cada_linha(tmp_path):
+    path = tmp_path / 'arestas.txt'
+    # A primeira aresta sem peso não pode ditar o formato das demais.
+    path.write_text('# médicos e hospitais\nD0 H0\nD1 H1 2.5\n\nD2 H0 4\n')
+    graph = BipartiteGraph.from_edge_file(str(path))
+    assert graph.get_U() == ['D0', 'D1', 'D2'] and graph.get_V() == ['H0', 'H1']
+    assert [graph.weight('D0', 'H0'), graph.weight('D1', 'H1'), graph.weight('D2', 'H0')] == [1.0, 2.5, 4.0]
+    path.write_text('D0 H0 1\n# comentário\nD1 H1 2 7\n')
+    with pytest.raises(ValueError, match='Linha 3'):
+        BipartiteGraph.from_edge_file(str(path))
+    path.write_text('D0 H0\nD1\n')
+    with pytest.raises(ValueError, match='Linha 2'):
+        BipartiteGraph.from_edge_file(str(path))
+
+
+def test_arquivo_de_arestas_igual_ao_gerador(tmp_path):
+    path = str(tmp_path / 'arestas.txt')
+    write_bipartite(path, 40, 30, seed=5, weights=(1, 9))
+    graph = bipartite_graph(40, 30, seed=5, weights=(1, 9))
+    loaded = BipartiteGraph.from_edge_file(path)
+    assert loaded.weights == graph.weights
+
+
+def random_assignment_graph(rng, n_U, n_V, weight):
+    # Uma aresta de uma permutação por vértice de U garante atribuição completa.
+    edges = {(u, v) for u, v in zip(range(n_U), rng.sample(range(n_V), n_U))}
+    edges.update((rng.randrange(n_U), rng.randrange(n_V)) for _ in range(2 * n_U))
+    edges = sorted(edges)
+    weights = {edge: weight() for edge in edges}
+    graph = BipartiteGraph.from_edges(array('i', [u for u, _ in edges]), array('i', [v for _, v in edges]),
+                                      [f'D{i}' for i in range(n_U)], [f'H{j}' for j in range(n_V)],
+                                      array('d', [weights[edge] for edge in edges]))
+    return graph, weights
+
+
+def best_assignment(n_U, n_V, weights):
+    # Força bruta: todas as escolhas de vértices distintos de V para U.
+    return max(sum(weights[u, v] for u, v in enumerate(choice))
+               for choice in permutations(range(n_V), n_U)
+               if all((u, v) in weights for u, v in enumerate(choice)))
+
+
+@pytest.mark.parametrize('kind', ['inteiros', 'fracionários'])
+def test_leilao_confere_com_forca_bruta(kind):
+    rng = random.Random(7)
+    for _ in range(30):
+        n_U = rng.randint(1, 6)
+        n_V = rng.randint(n_U, 7)
+        if kind == 'inteiros':
+            graph, weights = random_assignment_graph(rng, n_U, n_V, lambda: rng.randint(-5, 20))
+        else:
+            graph, weights = random_assignment_graph(rng, n_U, n_V, lambda: rng.uniform(-5, 20))
+        optimum = best_assignment(n_U, n_V, weights)
+        auction = AuctionMatching(graph)
+        size, pairs = auction.max_matching()
+        assert size == n_U and len(set(pairs.values())) == n_U
+        assert auction.total_weight == pytest.approx(sum(graph.weight(u, v) for u, v in pairs.items()))
+        if kind == 'inteiros':
+            assert auction.total_weight == optimum
+        else:
+            assert optimum - 1.0 < auction.total_weight <= optimum + 1e-9
+            precise = AuctionMatching(graph, tolerance=1e-6)
+            precise.max_matching()
+            assert optimum - 1e-6 < precise.total_weight <= optimum + 1e-9
+
+
+def copy_graph(graph):
+    copy = BipartiteGraph(list(graph.get_U()), list(graph.get_V()))
+    for u in graph.get_U():
+        for v in graph.neighbors(u):
+            copy.add_edge(u, v)
+    return copy
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_emparelhamento_dinamico_confere_com_recalculo(seed):
+    rng = random.Random(seed)
+    U = [f'D{i}' for i in range(rng.randint(1, 12))]
+    V = [f'H{j}' for j in range(rng.randint(1, 12))]
+    graph = BipartiteGraph(list(U), list(V))
+    for u in U:
+        for v in rng.sample(V, min(rng.randint(0, 3), len(V))):
+            graph.add_edge(u, v)
+    dynamic = DynamicMatching(graph, init=rng.choice([None, *INITIAL_MATCHINGS]))
+    fresh = iter(range(100, 1000))
+    for _ in range(60):
+        op = rng.random()
+        U, V = graph.get_U(), graph.get_V()
+        if op < 0.35 and U and V:
+            dynamic.add_edge(rng.choice(U), rng.choice(V))
+        elif op < 0.7:
+            edges = [(u, v) for u in U for v in graph.neighbors(u)]
+            if edges:
+                dynamic.remove_edge(*rng.choice(edges))
+        elif op < 0.78:
+            dynamic.add_vertex_U(f'D{next(fresh)}')
+        elif op < 0.86:
+            dynamic.add_vertex_V(f'H{next(fresh)}')
+        elif op < 0.93 and len(U) > 1:
+            dynamic.remove_vertex_U(rng.choice(U))
+        elif len(V) > 1:
+            dynamic.remove_vertex_V(rng.choice(V))
+        size, pair_U = dynamic.max_matching()
+        matched = {u: v for u, v in pair_U.items() if v is not None}
+        assert set(pair_U) == set(graph.get_U()) and len(matched) == size
+        assert all(v in graph.neighbors(u) and dynamic.pair_V[v] == u for u, v in matched.items())
+        assert size == HopcroftKarp(copy_graph(graph)).max_matching()[0]
+
+
+def several_components(rng, blocks):
+    # Blocos aleatórios com vértices disjuntos, mais um médico e um hospital
+    # isolados: cada bloco forma uma ou mais componentes.
+    us, vs, n_U, n_V = array('i'), array('i'), 0, 0
+    for _ in range(blocks):
+        size_U, size_V = rng.randint(1, 30), rng.randint(1, 30)
+        for u in range(size_U):
+            for v in rng.sample(range(size_V), min(rng.randint(1, 3), size_V)):
+                us.append(n_U + u)
+                vs.append(n_V + v)
+        n_U, n_V = n_U + size_U, n_V + size_V
+    return BipartiteGraph.from_edges(us, vs, [f'D{i}' for i in range(n_U + 1)], [f'H{j}' for j in range(n_V + 1)])
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_componentes_conferem_com_hopcroft_karp(workers):
+    graph = several_components(random.Random(11), 12)
+    expected = HopcroftKarp(graph).max_matching()[0]
+    # batch_edges pequeno reparte as componentes em vários lotes.
+    matcher = ComponentMatching(graph, workers=workers, batch_edges=16)
+    size, pairs = matcher.max_matching()
+    assert size == expected and matcher.components >= 12
+    matched = {u: v for u, v in pairs.items() if v is not None}
+    assert set(pairs) == set(graph.get_U()) and len(matched) == size
+    assert len(set(matched.values())) == size
+    assert all(v in graph.neighbors(u) for u, v in matched.items())
+
+
+def max_flow(graph):
+    # Referência: Edmonds-Karp na rede fonte -> u (capacidade de u) -> v
+    # (1 por aresta) -> sumidouro (capacidade de v).
+    cap_U, cap_V = graph.capacities()
+    source, sink = 's', 't'
+    residual = {}
+
+    def arc(a, b, capacity):
+        residual.setdefault(a, {})[b] = capacity
+        residual.setdefault(b, {}).setdefault(a, 0)
+    for i, u in enumerate(graph.get_U()):
+        arc(source, ('U', u), cap_U[i])
+        for v in graph.neighbors(u):
+            arc(('U', u), ('V', v), 1)
+    for j, v in enumerate(graph.get_V()):
+        arc(('V', v), sink, cap_V[j])
+    flow = 0
+    while True:
+        parent, queue = {source: None}, [source]
+        for a in queue:
+            for b, capacity in residual[a].items():
+                if capacity > 0 and b not in parent:
+                    parent[b] = a
+                    queue.append(b)
+        if sink not in parent:
+            return flow
+        b = sink
+        while parent[b] is not None:
+            residual[parent[b]][b] -= 1
+            residual[b][parent[b]] += 1
+            b = parent[b]
+        flow += 1
+
+
+@pytest.mark.parametrize('seed', range(15))
+def test_hk_capacitado_confere_com_fluxo_maximo(seed):
+    rng = random.Random(seed)
+    graph = bipartite_graph(rng.randint(1, 25), rng.randint(1, 15), min_degree=0, max_degree=4, seed=seed)
+    # Capacidades de 0 até acima do grau do vértice.
+    for u in graph.get_U():
+        graph.set_capacity_U(u, rng.randint(0, len(graph.neighbors(u)) + 2))
+    for v in graph.get_V():
+        graph.set_capacity_V(v, rng.randint(0, len(graph.neighbors_V(v)) + 2))
+    size, assignment = CapacitatedHopcroftKarp(graph).max_matching()
+    assert size == max_flow(graph)
+    cap_U, cap_V = graph.capacities()
+    load_V = dict.fromkeys(graph.get_V(), 0)
+    for i, u in enumerate(graph.get_U()):
+        assert len(assignment[u]) <= cap_U[i] and len(set(assignment[u])) == len(assignment[u])
+        assert all(v in graph.neighbors(u) for v in assignment[u])
+        for v in assignment[u]:
+            load_V[v] += 1
+    assert all(load_V[v] <= cap_V[j] for j, v in enumerate(graph.get_V()))
+    assert sum(load_V.values()) == size